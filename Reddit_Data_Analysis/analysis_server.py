@@ -0,0 +1,400 @@
+import json
+import os
+import re
+import socketserver
+import threading
+import time
+import traceback
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from analyze_reddit_visuals import (THEMES, THEME_KEYWORDS, stop_words, tokenizer, categorize_text,
+                                    AGGREGATE_BUILDERS, aggregate_hash, RENDERERS)
+from sampling import sample_posts
+from filtered_posts import read_posts
+from nlp_resources import get_analyzer
+from profiling import StageProfiler
+from tokenizer import top_unigrams, top_bigrams
+
+# --- 1. CONFIGURATION ---
+# CHANGE THIS to the FOLDER containing filtered .txt files
+INPUT_FOLDER = r"/Users/maitreya/Documents/NEU/CS 5170 - AI for HCI/Code/SkillBridge/reddit_analysis"
+
+# Same dev sampling settings as the analysis scripts (see run_queries.py)
+SAMPLE_SIZE = None
+SAMPLE_RATE = None
+SAMPLE_STRATIFY = None
+
+# The server only listens locally. Set UNIX_SOCKET to a path to listen on a Unix socket
+# instead of HOST:PORT (e.g. curl --unix-socket analysis.sock http://localhost/status).
+HOST = "127.0.0.1"
+PORT = 8765
+UNIX_SOCKET = None
+
+# Rendered charts are kept here, named by the content hash of their input, so asking
+# for the same chart twice only renders it once
+CHART_FOLDER = "server_charts"
+
+# Sentiment thresholds used by every query, same as run_queries.py
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Word pieces of a keyword, looked up in the token index
+PIECE_RE = re.compile(r'\w+')
+
+# Maximum number of sample posts (and characters per post) a /posts request returns
+MAX_SAMPLE_POSTS = 50
+SAMPLE_CHARS = 500
+
+USAGE = {
+    '/status': 'corpus size and load time',
+    '/themes': 'post count per theme',
+    '/sentiment': 'sentiment summary',
+    '/ngrams': 'top unigrams and bigrams (unigrams=20, bigrams=15)',
+    '/posts': 'matching post count and sample posts (limit=5)',
+    '/charts/<chart>.png': 'one of the analyze_reddit_visuals charts: ' + ', '.join(RENDERERS),
+    'POST /reload': 'reload the corpus from INPUT_FOLDER in the background',
+    'filters': "theme=<theme>, keyword=<a|b> (substring, like run_queries), "
+               "sentiment=positive|neutral|negative, subreddit=<name>; repeat a filter to AND it",
+}
+
+
+# --- 2. WARM CORPUS ---
+class Corpus:
+    """The enriched corpus, held in memory: text, themes, sentiment and token ids per post.
+
+    Built once, then only read, so any number of request threads can query it at the same time.
+    """
+
+    def __init__(self, folder_path):
+        profiler = StageProfiler('analysis_server')
+        with profiler.stage('load'):
+            texts = []
+            subreddits = []
+            posts = sample_posts(read_posts(folder_path), size=SAMPLE_SIZE, rate=SAMPLE_RATE,
+                                 stratify=SAMPLE_STRATIFY, categorize=categorize_text)
+            for post in posts:
+                text = (post.get('title', '') + ' ' + post.get('body', post.get('selftext', ''))).lower().strip()
+                if text:
+                    texts.append(text)
+                    subreddits.append((post.get('subreddit') or '').lower())
+        profiler.count('load', 'posts', len(texts))
+        self.texts = texts
+        self.subreddits = np.array(subreddits, dtype=object)
+
+        with profiler.stage('tag'):
+            self.themes = [categorize_text(text) for text in texts]
+            self.theme_masks = {theme: np.zeros(len(texts), dtype=bool) for theme in list(THEMES) + ['Other']}
+            for i, themes in enumerate(self.themes):
+                for theme in themes:
+                    self.theme_masks[theme][i] = True
+        profiler.count('tag', 'posts', len(texts))
+
+        with profiler.stage('sentiment'):
+            analyzer = get_analyzer()
+            self.sentiment = np.fromiter((analyzer.polarity_scores(text)['compound'] for text in texts),
+                                         dtype=np.float64, count=len(texts))
+        profiler.count('sentiment', 'posts', len(texts))
+
+        with profiler.stage('index'):
+            self.token_ids = tokenizer.tokenize_all(texts)
+            self._build_postings()
+            # Words dropped by the tokenizer; a keyword inside one of these cannot use the index
+            self._dropped = frozenset(stop_words) - frozenset(THEME_KEYWORDS)
+            self._vocab_size = len(tokenizer.vocab.words)
+            self._word_matches = {}
+        profiler.count('index', 'posts', len(texts))
+
+        self.loaded_at = datetime.now().isoformat(timespec='seconds')
+        self.load_seconds = round(profiler.report()['wall_seconds'], 3)
+        for line in profiler.summary_lines():
+            print(line)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _build_postings(self):
+        """Inverted index from token id to the posts containing it, in CSR form."""
+        lengths = np.array([len(ids) for ids in self.token_ids], dtype=np.int64)
+        if lengths.sum() == 0:
+            self._posting_docs = np.zeros(0, dtype=np.int64)
+            self._posting_offsets = np.zeros(len(tokenizer.vocab.words) + 1, dtype=np.int64)
+            return
+        flat = np.concatenate(self.token_ids)
+        docs = np.repeat(np.arange(len(self.token_ids), dtype=np.int64), lengths)
+        order = np.argsort(flat, kind='stable')  # Stable, so each posting list stays in post order
+        self._posting_docs = docs[order]
+        self._posting_offsets = np.zeros(len(tokenizer.vocab.words) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(flat, minlength=len(tokenizer.vocab.words)), out=self._posting_offsets[1:])
+
+    def _candidates(self, term):
+        """Posts that may contain term as a substring, or None if the index cannot tell."""
+        pieces = PIECE_RE.findall(term)
+        if not pieces:
+            return None
+        # Any text containing the term contains its longest word piece inside one of its words
+        piece = max(pieces, key=len)
+        if any(piece in word for word in self._dropped):
+            return None
+        word_ids = self._word_matches.get(piece)
+        if word_ids is None:
+            word_ids = [i for i, word in enumerate(tokenizer.vocab.words[:self._vocab_size]) if piece in word]
+            self._word_matches[piece] = word_ids
+        if not word_ids:
+            return np.zeros(0, dtype=np.int64)
+        offsets = self._posting_offsets
+        return np.unique(np.concatenate([self._posting_docs[offsets[i]:offsets[i + 1]] for i in word_ids]))
+
+    def match_keyword(self, pattern):
+        """Posts containing any of the '|'-separated terms of pattern, as a boolean mask."""
+        mask = np.zeros(len(self.texts), dtype=bool)
+        for term in pattern.lower().split('|'):
+            if not term:
+                continue
+            candidates = self._candidates(term)
+            if candidates is None:
+                candidates = range(len(self.texts))
+            texts = self.texts
+            mask[[i for i in candidates if term in texts[i]]] = True
+        return mask
+
+    def select(self, filters):
+        """Indices of the posts matching every filter (see USAGE['filters'])."""
+        mask = np.ones(len(self.texts), dtype=bool)
+        for theme in filters.get('theme', []):
+            if theme not in self.theme_masks:
+                raise QueryError(f"Unknown theme '{theme}'. Themes: {', '.join(self.theme_masks)}")
+            mask &= self.theme_masks[theme]
+        for pattern in filters.get('keyword', []):
+            mask &= self.match_keyword(pattern)
+        for sentiment in filters.get('sentiment', []):
+            if sentiment == 'positive':
+                mask &= self.sentiment > POSITIVE_THRESHOLD
+            elif sentiment == 'negative':
+                mask &= self.sentiment < NEGATIVE_THRESHOLD
+            elif sentiment == 'neutral':
+                mask &= (self.sentiment >= NEGATIVE_THRESHOLD) & (self.sentiment <= POSITIVE_THRESHOLD)
+            else:
+                raise QueryError("sentiment must be positive, neutral or negative")
+        if filters.get('subreddit'):
+            mask &= np.isin(self.subreddits, [name.lower() for name in filters['subreddit']])
+        return np.flatnonzero(mask)
+
+    # --- Queries ---
+    def theme_counts(self, selected):
+        counts = {theme: int(mask[selected].sum()) for theme, mask in self.theme_masks.items()}
+        return dict(sorted(counts.items(), key=lambda item: -item[1]))
+
+    def sentiment_summary(self, selected):
+        scores = self.sentiment[selected]
+        return {
+            'posts': len(scores),
+            'average_compound': round(float(scores.mean()), 4) if len(scores) else None,
+            'positive': int((scores > POSITIVE_THRESHOLD).sum()),
+            'neutral': int(((scores >= NEGATIVE_THRESHOLD) & (scores <= POSITIVE_THRESHOLD)).sum()),
+            'negative': int((scores < NEGATIVE_THRESHOLD).sum()),
+        }
+
+    def ngrams(self, selected, n_unigrams, n_bigrams):
+        token_ids = [self.token_ids[i] for i in selected]
+        return {
+            'unigrams': [[word, count] for word, count in top_unigrams(token_ids, tokenizer.vocab, n_unigrams)],
+            'bigrams': [[f"{w1} {w2}", count] for (w1, w2), count in top_bigrams(token_ids, tokenizer.vocab, n_bigrams)],
+        }
+
+    def sample(self, selected, limit):
+        """Reproducible sample of matching posts, like run_queries' sample(random_state=42)."""
+        if len(selected) > limit:
+            selected = np.sort(np.random.default_rng(42).choice(selected, limit, replace=False))
+        return [self.texts[i][:SAMPLE_CHARS].strip() for i in selected]
+
+    def chart(self, name, selected):
+        """Renders one of the analyze_reddit_visuals charts for the selection and returns its path."""
+        import pandas as pd
+        df = pd.DataFrame({
+            'themes': [self.themes[i] for i in selected],
+            'sentiment': self.sentiment[selected],
+        })
+        # Only this chart's aggregate; the cached PNG is found by its hash
+        aggregate = AGGREGATE_BUILDERS[name](df, df.explode('themes'), [self.token_ids[i] for i in selected])
+        if not aggregate:
+            # e.g. the sentiment boxplot when only 'Other' posts match, or a word chart with no words left
+            raise QueryError(f"The selected posts give {name} nothing to draw")
+        path = os.path.join(CHART_FOLDER, f"{aggregate_hash(name, aggregate)}.png")
+        if not os.path.exists(path):
+            # pyplot keeps global state, so charts are drawn one at a time
+            with _render_lock:
+                if not os.path.exists(path):
+                    os.makedirs(CHART_FOLDER, exist_ok=True)
+                    tmp_path = path[:-len('.png')] + f".{threading.get_ident()}.tmp.png"
+                    RENDERERS[name](aggregate, tmp_path)
+                    os.replace(tmp_path, path)
+        return path
+
+
+_render_lock = threading.Lock()
+
+
+class QueryError(ValueError):
+    """A bad request from a client; reported back as HTTP 400."""
+
+
+# --- 3. HTTP API ---
+def int_param(params, name, default, maximum=None):
+    values = params.get(name)
+    if not values:
+        return default
+    try:
+        value = int(values[0])
+    except ValueError:
+        raise QueryError(f"{name} must be an integer")
+    if value < 0:
+        raise QueryError(f"{name} must not be negative")
+    return min(value, maximum) if maximum is not None else value
+
+
+class AnalysisHandler(BaseHTTPRequestHandler):
+    server_version = "SkillBridgeAnalysis/1.0"
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_file(self, path, content_type):
+        with open(path, 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        # Read the corpus once per request, so a reload never swaps it out mid-query
+        corpus = self.server.corpus
+        try:
+            if url.path == '/':
+                self.send_json(200, USAGE)
+                return
+            if url.path == '/status':
+                self.send_json(200, {
+                    'posts': len(corpus),
+                    'vocabulary': corpus._vocab_size,
+                    'loaded_at': corpus.loaded_at,
+                    'load_seconds': corpus.load_seconds,
+                    'reloading': self.server.reloading.locked(),
+                    'themes': list(corpus.theme_masks),
+                })
+                return
+
+            selected = corpus.select(params)
+            if url.path == '/themes':
+                result = {'themes': corpus.theme_counts(selected)}
+            elif url.path == '/sentiment':
+                result = corpus.sentiment_summary(selected)
+            elif url.path == '/ngrams':
+                result = corpus.ngrams(selected, int_param(params, 'unigrams', 20), int_param(params, 'bigrams', 15))
+            elif url.path == '/posts':
+                result = {'samples': corpus.sample(selected, int_param(params, 'limit', 5, MAX_SAMPLE_POSTS))}
+            elif url.path.startswith('/charts/'):
+                name = url.path[len('/charts/'):]
+                if name not in RENDERERS:
+                    self.send_json(404, {'error': f"Unknown chart '{name}'. Charts: {', '.join(RENDERERS)}"})
+                    return
+                if not len(selected):
+                    raise QueryError("No posts match these filters")
+                self.send_file(corpus.chart(name, selected), 'image/png')
+                return
+            else:
+                self.send_json(404, {'error': f"Unknown path '{url.path}'", 'usage': USAGE})
+                return
+        except QueryError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            # Always answer, so a bug in one query never leaves the client with a dropped connection
+            self.log_error("Error handling %s:\n%s", self.path, traceback.format_exc())
+            self.send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+        result['matched'] = len(selected)
+        result['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        self.send_json(200, result)
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/reload':
+            self.send_json(404, {'error': f"Unknown path '{self.path}'"})
+            return
+        if not self.server.reloading.acquire(blocking=False):
+            self.send_json(409, {'error': 'A reload is already running'})
+            return
+        threading.Thread(target=reload_corpus, args=(self.server,), daemon=True).start()
+        self.send_json(202, {'status': 'reloading'})
+
+
+def reload_corpus(server):
+    """Builds a fresh corpus while the old one keeps answering, then swaps it in."""
+    try:
+        print(f"Reloading corpus from {INPUT_FOLDER}...")
+        server.corpus = Corpus(INPUT_FOLDER)
+        print(f"Reload complete: {len(server.corpus)} posts/comments.")
+    except Exception as e:
+        print(f"Reload failed, still serving the previous corpus: {e}")
+    finally:
+        server.reloading.release()
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def make_server(corpus):
+    if UNIX_SOCKET:
+        if os.path.exists(UNIX_SOCKET):
+            os.remove(UNIX_SOCKET)  # Left over from a previous run
+        server = ThreadingUnixHTTPServer(UNIX_SOCKET, AnalysisHandler)
+        address = f"unix:{UNIX_SOCKET}"
+    else:
+        server = ThreadingHTTPServer((HOST, PORT), AnalysisHandler)
+        address = f"http://{HOST}:{PORT}"
+    server.corpus = corpus
+    server.reloading = threading.Lock()
+    return server, address
+
+
+# --- 4. MAIN EXECUTION ---
+def main():
+    print(f"Loading corpus from {INPUT_FOLDER}...")
+    corpus = Corpus(INPUT_FOLDER)
+    if not len(corpus):
+        print("No data loaded. Please check your INPUT_FOLDER path.")
+        return
+    print(f"Loaded {len(corpus)} posts/comments.")
+
+    server, address = make_server(corpus)
+    print(f"Serving analysis queries on {address} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+    finally:
+        server.server_close()
+        if UNIX_SOCKET and os.path.exists(UNIX_SOCKET):
+            os.remove(UNIX_SOCKET)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,14 @@
 import json
 import re
-import pandas as pd
 import os
-import nltk
-from nltk.corpus import stopwords
-from collections import Counter
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from tokenizer import Tokenizer, top_unigrams, top_bigrams
+from sampling import sample_posts
+from nlp_resources import load_stop_words, get_analyzer
+from profiling import StageProfiler
 
 # --- 1. SETUP ---
-nltk.download('stopwords')
-stop_words = set(stopwords.words('english'))
-
-# Initialize the VADER sentiment analyzer
-analyzer = SentimentIntensityAnalyzer()
+# pandas and the VADER analyzer are loaded in main(), only when they are needed
+stop_words = load_stop_words()
 
 # Define keyword themes based on Affinity Map clusters
 # These are used to categorize each post
@@ -39,18 +35,31 @@ THEMES = {
     ]
 }
 
+# Stop words are dropped for N-grams, BUT our important theme keywords are kept
+THEME_KEYWORDS = set(kw for kws in THEMES.values() for kw in kws)
+tokenizer = Tokenizer(stop_words, THEME_KEYWORDS)
+
 # --- 2. CONFIGURATION ---
 INPUT_FOLDER = '/Users/maitreya/Documents/NEU/CS 5170 - AI for HCI/Code/SkillBridge/reddit_analysis' 
 
+# Dev sampling: set SAMPLE_SIZE (posts) or SAMPLE_RATE (fraction) to load a reproducible
+# sample instead of the whole corpus. Posts are picked by a hash of their id, so the same
+# sample comes back on every run. SAMPLE_STRATIFY can be None, 'subreddit' or 'theme'; a
+# stratified SAMPLE_SIZE is still the total, split across strata in proportion to their size.
+SAMPLE_SIZE = None
+SAMPLE_RATE = None
+SAMPLE_STRATIFY = None
 
-def load_data(folder_path):
-    """Loads all .txt (JSONL) files from a folder into a list of dictionaries."""
-    data = []
-    if not os.path.isdir(folder_path):
-        print(f"Error: Path is not a valid folder: {folder_path}")
-        return data
+# Per-stage profile (wall/CPU time, throughput, peak memory) is printed at the end of every run.
+# Set these to paths to also write it as JSON and/or as a Prometheus textfile.
+PROFILE_REPORT = None
+PROMETHEUS_TEXTFILE = None
 
-    print(f"Reading files from folder: {folder_path}")
+profiler = StageProfiler('analyze_reddit')
+
+
+def read_posts(folder_path):
+    """Yields every parsed post/comment from the .txt (JSONL) files in a folder."""
     for filename in os.listdir(folder_path):
         if filename.endswith(".txt"):  # Look for the .txt files from your filter script
             filepath = os.path.join(folder_path, filename)
@@ -59,33 +68,37 @@ def load_data(folder_path):
                 for line in f:
                     try:
                         post = json.loads(line)
-                        # Get text: use 'body' for comments, 'selftext' for post text
-                        # Or combine title and selftext for posts
-                        text_content = post.get('body', post.get('selftext', ''))
-                        title = post.get('title', '')
-
-                        # Combine title and body/selftext for a complete picture
-                        text = (title + ' ' + text_content).lower().strip()
-
-                        if text:
-                            data.append({'text': text})
                     except json.JSONDecodeError:
                         # print(f"Skipping bad line: {line}") # Uncomment for debugging
                         continue
-    return data
+                    if post.get('_duplicate'):
+                        continue  # Marked by dedup.py
+                    yield post
 
 
-def clean_text_for_ngrams(text):
-    """Cleans text for N-gram frequency analysis."""
-    text = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
-    words = text.split()
-    # Remove stopwords, BUT keep our important theme keywords
-    theme_keywords = set(kw for kws in THEMES.values() for kw in kws)
-    cleaned_words = [
-        w for w in words 
-        if w not in stop_words or w in theme_keywords
-    ]
-    return cleaned_words
+def load_data(folder_path):
+    """Loads all .txt (JSONL) files from a folder into a list of dictionaries."""
+    data = []
+    if not os.path.isdir(folder_path):
+        print(f"Error: Path is not a valid folder: {folder_path}")
+        return data
+
+    print(f"Reading files from folder: {folder_path}")
+    posts = sample_posts(read_posts(folder_path), size=SAMPLE_SIZE, rate=SAMPLE_RATE,
+                         stratify=SAMPLE_STRATIFY, categorize=categorize_text)
+    for post in posts:
+        # Get text: use 'body' for comments, 'selftext' for post text
+        # Or combine title and selftext for posts
+        text_content = post.get('body', post.get('selftext', ''))
+        title = post.get('title', '')
+
+        # Combine title and body/selftext for a complete picture
+        text = (title + ' ' + text_content).lower().strip()
+
+        if text:
+            data.append({'text': text})
+    return data
+
 
 def categorize_text(text):
     """Tags text with one or more themes based on keywords."""
@@ -100,20 +113,26 @@ def categorize_text(text):
 def main():
     # --- 3. LOAD & PREPARE DATA ---
     print(f"Loading data from {INPUT_FOLDER}...")
-    data = load_data(INPUT_FOLDER)
+    with profiler.stage('load'):
+        data = load_data(INPUT_FOLDER)
     if not data:
         print("No data loaded. Please check your INPUT_FILE path and format.")
         return
 
-    df = pd.DataFrame(data)
+    with profiler.stage('load'):
+        import pandas as pd
+        df = pd.DataFrame(data)
+    profiler.count('load', 'posts', len(df))
     print(f"Successfully loaded {len(df)} posts/comments.")
 
     # --- 4. THEMATIC ANALYSIS ---
     print("\n--- Thematic Analysis ---")
-    df['themes'] = df['text'].apply(categorize_text)
-    
-    # Explode the 'themes' list so each theme gets its own row for counting
-    df_themes_exploded = df.explode('themes')
+    with profiler.stage('tag'):
+        df['themes'] = df['text'].apply(categorize_text)
+
+        # Explode the 'themes' list so each theme gets its own row for counting
+        df_themes_exploded = df.explode('themes')
+    profiler.count('tag', 'posts', len(df))
     
     theme_counts = df_themes_exploded['themes'].value_counts()
     print("Post/Comment Count by Theme:")
@@ -126,9 +145,12 @@ def main():
     anxiety_df = df_themes_exploded[df_themes_exploded['themes'] == 'AI_Anxiety']
     
     if not anxiety_df.empty:
-        sentiments = anxiety_df['text'].apply(
-            lambda text: analyzer.polarity_scores(text)['compound']
-        )
+        with profiler.stage('sentiment'):
+            analyzer = get_analyzer()
+            sentiments = anxiety_df['text'].apply(
+                lambda text: analyzer.polarity_scores(text)['compound']
+            )
+        profiler.count('sentiment', 'posts', len(sentiments))
         
         print(f"Total 'AI_Anxiety' posts analyzed: {len(sentiments)}")
         print(f"Average Compound Sentiment: {sentiments.mean():.4f} (from -1 Negative to +1 Positive)")
@@ -141,24 +163,26 @@ def main():
     # --- 6. KEYWORD & PHRASE FREQUENCY ANALYSIS ---
     print("\n--- Keyword & Phrase Frequency (N-grams) ---")
     
-    # Clean all text and combine into one giant list of words
-    all_words = []
-    for words_list in df['text'].apply(clean_text_for_ngrams):
-        all_words.extend(words_list)
+    with profiler.stage('ngram'):
+        # Clean all text in batches into token-id arrays (one per post)
+        token_ids = tokenizer.tokenize_all(df['text'])
+        unigram_counts = top_unigrams(token_ids, tokenizer.vocab, 30)
+        bigram_counts = top_bigrams(token_ids, tokenizer.vocab, 20)
+    profiler.count('ngram', 'posts', len(token_ids))
 
     # Unigrams (Single Keywords)
-    unigram_counts = Counter(all_words)
     print("\nTop 30 Most Common Keywords (Unigrams):")
-    for word, count in unigram_counts.most_common(30):
+    for word, count in unigram_counts:
         print(f"  {word}: {count}")
 
     # Bigrams (Two-word Phrases)
-    bigrams = list(nltk.bigrams(all_words))
-    bigram_counts = Counter(bigrams)
     print("\nTop 20 Most Common Phrases (Bigrams):")
-    for (w1, w2), count in bigram_counts.most_common(20):
+    for (w1, w2), count in bigram_counts:
         print(f"  {w1} {w2}: {count}")
 
+    print()
+    profiler.finish(PROFILE_REPORT, PROMETHEUS_TEXTFILE)
+
 
 if __name__ == "__main__":
     main()
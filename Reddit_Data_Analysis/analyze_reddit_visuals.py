@@ -1,27 +1,16 @@
+import hashlib
 import json
 import re
-import pandas as pd
 import os
-import nltk
-from nltk.corpus import stopwords
-from nltk.util import ngrams
-from collections import Counter
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-import matplotlib.pyplot as plt
-import seaborn as sns # Recommended for nicer statistical plots
-from wordcloud import WordCloud
-import numpy as np
+from tokenizer import Tokenizer, top_bigrams, top_unigrams
+from sampling import sample_posts
+from filtered_posts import read_posts
+from nlp_resources import load_stop_words, get_analyzer
+from profiling import StageProfiler
 
 # --- 1. SETUP ---
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-
-stop_words = set(stopwords.words('english'))
-
-# Initialize the VADER sentiment analyzer
-analyzer = SentimentIntensityAnalyzer()
+# pandas, the plotting libraries and the VADER analyzer are loaded only where they are used
+stop_words = load_stop_words()
 
 # Define keyword themes based on Affinity Map clusters
 THEMES = {
@@ -47,9 +36,40 @@ THEMES = {
     ]
 }
 
+# Stop words are dropped for word analysis, BUT important theme keywords are kept
+THEME_KEYWORDS = set(kw for kws in THEMES.values() for kw in kws)
+tokenizer = Tokenizer(stop_words, THEME_KEYWORDS)
+
 # --- 2. CONFIGURATION ---
 INPUT_FOLDER = '/Users/maitreya/Documents/NEU/CS 5170 - AI for HCI/Code/SkillBridge/reddit_analysis' 
 
+# Dev sampling: set SAMPLE_SIZE (posts) or SAMPLE_RATE (fraction) to load a reproducible
+# sample instead of the whole corpus. Posts are picked by a hash of their id, so the same
+# sample comes back on every run. SAMPLE_STRATIFY can be None, 'subreddit' or 'theme'; a
+# stratified SAMPLE_SIZE is still the total, split across strata in proportion to their size.
+SAMPLE_SIZE = None
+SAMPLE_RATE = None
+SAMPLE_STRATIFY = None
+
+# Charts are written here, next to a cache of the content hash of each chart's input.
+# A chart is only re-rendered when its input changes.
+OUTPUT_FOLDER = '.'
+VIZ_CACHE_FILE = 'viz_cache.json'
+RENDER_VERSION = 1
+
+# Charts are rendered in parallel worker processes
+RENDER_WORKERS = os.cpu_count() or 1
+
+# The word cloud only ever draws this many words, so only the top ones are kept
+WORDCLOUD_MAX_WORDS = 200
+
+# Per-stage profile (wall/CPU time, throughput, peak memory) is printed at the end of every run.
+# Set these to paths to also write it as JSON and/or as a Prometheus textfile.
+PROFILE_REPORT = None
+PROMETHEUS_TEXTFILE = None
+
+profiler = StageProfiler('analyze_reddit_visuals')
+
 def load_data(folder_path):
     """Loads all .txt (JSONL) files from a folder into a list of dictionaries."""
     data = []
@@ -58,36 +78,17 @@ def load_data(folder_path):
         return data
 
     print(f"Reading files from folder: {folder_path}")
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".txt"):
-            filepath = os.path.join(folder_path, filename)
-            print(f"  -> Loading {filename}...")
-            with open(filepath, 'r', encoding='utf-8') as f:
-                for line in f:
-                    try:
-                        post = json.loads(line)
-                        text_content = post.get('body', post.get('selftext', ''))
-                        title = post.get('title', '')
-                        text = (title + ' ' + text_content).lower().strip()
-
-                        if text:
-                            data.append({'text': text})
-                    except json.JSONDecodeError:
-                        continue
-    return data
+    posts = sample_posts(read_posts(folder_path), size=SAMPLE_SIZE, rate=SAMPLE_RATE,
+                         stratify=SAMPLE_STRATIFY, categorize=categorize_text)
+    for post in posts:
+        text_content = post.get('body', post.get('selftext', ''))
+        title = post.get('title', '')
+        text = (title + ' ' + text_content).lower().strip()
 
+        if text:
+            data.append({'text': text})
+    return data
 
-def clean_text_for_ngrams(text):
-    """Cleans text for N-gram frequency analysis."""
-    text = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
-    words = text.split()
-    # Remove stopwords, BUT keep important theme keywords
-    theme_keywords = set(kw for kws in THEMES.values() for kw in kws)
-    cleaned_words = [
-        w for w in words 
-        if w not in stop_words or w in theme_keywords
-    ]
-    return cleaned_words
 
 def categorize_text(text):
     """Tags text with one or more themes based on keywords."""
@@ -97,121 +98,272 @@ def categorize_text(text):
             found_themes.append(theme)
     return found_themes if found_themes else ['Other']
 
-def generate_visualizations(df, df_themes_exploded, all_words):
-    """Generates and saves visualizations."""
-    print("\n Generating Visualizations: ")
-    
-    # Set the style
+# --- CHART AGGREGATES ---
+def sentiment_box_stats(sentiment):
+    """Boxplot statistics (quartiles and 1.5 IQR whiskers) for one theme's sentiment scores."""
+    q1, med, q3 = (float(q) for q in sentiment.quantile([0.25, 0.5, 0.75]))
+    iqr = q3 - q1
+    return {
+        'q1': round(q1, 6),
+        'med': round(med, 6),
+        'q3': round(q3, 6),
+        'whislo': round(float(sentiment[sentiment >= q1 - 1.5 * iqr].min()), 6),
+        'whishi': round(float(sentiment[sentiment <= q3 + 1.5 * iqr].max()), 6),
+    }
+
+
+def cooccurrence_matrix(theme_lists):
+    """Counts how often each pair of themes is tagged on the same post."""
+    unique_themes = list(THEMES.keys())
+    index = {theme: i for i, theme in enumerate(unique_themes)}
+    matrix = [[0] * len(unique_themes) for _ in unique_themes]
+    for themes in theme_lists:
+        if len(themes) < 2:
+            continue
+        for i in range(len(themes)):
+            for j in range(i + 1, len(themes)):
+                t1, t2 = index.get(themes[i]), index.get(themes[j])
+                if t1 is not None and t2 is not None:
+                    matrix[t1][t2] += 1
+                    matrix[t2][t1] += 1 # Symmetric
+    return {'themes': unique_themes, 'matrix': matrix}
+
+
+def theme_distribution_aggregate(df, df_themes_exploded, token_ids):
+    theme_counts = df_themes_exploded['themes'].value_counts()
+    return [[theme, int(count)] for theme, count in theme_counts.items()]
+
+
+def sentiment_boxplot_aggregate(df, df_themes_exploded, token_ids):
+    filtered_sentiment = df_themes_exploded[df_themes_exploded['themes'] != 'Other']
+    by_theme = filtered_sentiment.groupby('themes')['sentiment']
+    return [
+        dict(sentiment_box_stats(by_theme.get_group(theme)), label=theme)
+        for theme in THEMES if theme in by_theme.groups
+    ]
+
+
+def top_phrases_aggregate(df, df_themes_exploded, token_ids):
+    return [[f"{w1} {w2}", count] for (w1, w2), count in top_bigrams(token_ids, tokenizer.vocab, 20)]
+
+
+def wordcloud_aggregate(df, df_themes_exploded, token_ids):
+    return top_unigrams(token_ids, tokenizer.vocab, WORDCLOUD_MAX_WORDS)
+
+
+def cooccurrence_aggregate(df, df_themes_exploded, token_ids):
+    return cooccurrence_matrix(df['themes'])
+
+
+# Each chart is drawn from the output of its builder, keyed like RENDERERS
+AGGREGATE_BUILDERS = {
+    'viz_1_theme_distribution.png': theme_distribution_aggregate,
+    'viz_2_sentiment_boxplot.png': sentiment_boxplot_aggregate,
+    'viz_3_top_phrases.png': top_phrases_aggregate,
+    'viz_4_wordcloud.png': wordcloud_aggregate,
+    'viz_5_cooccurrence_heatmap.png': cooccurrence_aggregate,
+}
+
+
+def build_aggregates(df, df_themes_exploded, token_ids):
+    """Reduces the enriched corpus to the small inputs each chart is drawn from."""
+    return {filename: builder(df, df_themes_exploded, token_ids) for filename, builder in AGGREGATE_BUILDERS.items()}
+
+
+# --- CHART RENDERING ---
+# Each renderer runs in its own worker process and draws one chart from its aggregate
+def _pyplot():
+    import matplotlib
+    matplotlib.use('Agg')  # Headless: never open a window
+    import matplotlib.pyplot as plt
+    import seaborn as sns # Recommended for nicer statistical plots
     sns.set_theme(style="whitegrid")
+    return plt, sns
 
-    # 1. Bar Chart: Theme Distribution
+
+def render_theme_distribution(theme_counts, path):
+    """Bar Chart: Theme Distribution"""
+    plt, sns = _pyplot()
     plt.figure(figsize=(10, 6))
-    theme_counts = df_themes_exploded['themes'].value_counts()
-    sns.barplot(x=theme_counts.index, y=theme_counts.values, palette="viridis")
+    sns.barplot(x=[theme for theme, _ in theme_counts], y=[count for _, count in theme_counts], palette="viridis")
     plt.title('Distribution of Discussion Themes', fontsize=16)
     plt.xlabel('Theme', fontsize=12)
     plt.ylabel('Number of Posts', fontsize=12)
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.savefig('viz_1_theme_distribution.png')
-    print("  -> Saved 'viz_1_theme_distribution.png'")
-    
-    # 2. Sentiment Boxplot by Theme (Insight: Shows emotional range per topic)
-    plt.figure(figsize=(12, 8))
-    filtered_sentiment = df_themes_exploded[df_themes_exploded['themes'] != 'Other']
-    
-    sns.boxplot(x='themes', y='sentiment', data=filtered_sentiment, palette="coolwarm")
-    plt.title('Sentiment Distribution by Theme', fontsize=16)
-    plt.xlabel('Theme', fontsize=12)
-    plt.ylabel('Sentiment Score (-1 to 1)', fontsize=12)
-    plt.axhline(0, color='gray', linestyle='--') # Zero line for neutrality
-    plt.tight_layout()
-    plt.savefig('viz_2_sentiment_boxplot.png')
-    print("  -> Saved 'viz_2_sentiment_boxplot.png'")
+    plt.savefig(path)
+    plt.close('all')
+
 
-    # 3. Horizontal Bar Chart: Top 20 Bigrams (Insight: Contextual phrases)
-    bigrams = list(ngrams(all_words, 2))
-    bigram_counts = Counter(bigrams)
-    top_20_bigrams = bigram_counts.most_common(20)
-    
-    bigram_labels = [f"{w1} {w2}" for (w1, w2), freq in top_20_bigrams]
-    bigram_values = [freq for (w1, w2), freq in top_20_bigrams]
+def render_sentiment_boxplot(box_stats, path):
+    """Sentiment Boxplot by Theme (Insight: Shows emotional range per topic)"""
+    plt, sns = _pyplot()
+    fig, ax = plt.subplots(figsize=(12, 8))
+    if box_stats:
+        boxes = ax.bxp(box_stats, showfliers=False, patch_artist=True)
+        for patch, color in zip(boxes['boxes'], sns.color_palette("coolwarm", len(box_stats))):
+            patch.set_facecolor(color)
+    else:
+        # No post carries a theme (e.g. a small sample): draw the empty axis, as sns.boxplot did
+        ax.text(0.5, 0.5, 'No themed posts', ha='center', va='center', transform=ax.transAxes, color='gray')
+    ax.set_title('Sentiment Distribution by Theme', fontsize=16)
+    ax.set_xlabel('Theme', fontsize=12)
+    ax.set_ylabel('Sentiment Score (-1 to 1)', fontsize=12)
+    ax.axhline(0, color='gray', linestyle='--') # Zero line for neutrality
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close('all')
 
+
+def render_top_phrases(phrase_counts, path):
+    """Horizontal Bar Chart: Top 20 Bigrams (Insight: Contextual phrases)"""
+    plt, sns = _pyplot()
     plt.figure(figsize=(12, 10))
-    sns.barplot(x=bigram_values, y=bigram_labels, palette="magma")
+    sns.barplot(x=[count for _, count in phrase_counts], y=[label for label, _ in phrase_counts], palette="magma")
     plt.title('Top 20 Most Frequent Phrases (Bigrams)', fontsize=16)
     plt.xlabel('Frequency', fontsize=12)
     plt.tight_layout()
-    plt.savefig('viz_3_top_phrases.png')
-    print("  -> Saved 'viz_3_top_phrases.png'")
+    plt.savefig(path)
+    plt.close('all')
+
 
-    # 4. Word Cloud (Insight: High level overview)
-    unigram_counts = Counter(all_words)
-    print("  -> Generating Word Cloud...")
-    wc = WordCloud(width=1600, height=800, background_color='white', colormap='ocean').generate_from_frequencies(unigram_counts)
+def render_wordcloud(top_words, path):
+    """Word Cloud (Insight: High level overview)"""
+    plt, _ = _pyplot()
+    from wordcloud import WordCloud
+    # Layout at half resolution, drawn at 2x: same 1600x800 image, far less placement work
+    wc = WordCloud(width=800, height=400, scale=2, max_words=WORDCLOUD_MAX_WORDS,
+                   background_color='white', colormap='ocean').generate_from_frequencies(dict(top_words))
     plt.figure(figsize=(15, 7))
     plt.imshow(wc, interpolation='bilinear')
     plt.axis('off')
     plt.title('Word Cloud of Career Discussions', fontsize=16)
     plt.tight_layout()
-    plt.savefig('viz_4_wordcloud.png')
-    print("  -> Saved 'viz_4_wordcloud.png'")
-
-    # 5. Co-occurrence Heatmap (Insight: How often themes overlap)
-    # Filter out 'Other' first
-    df_filtered = df[df['themes'].apply(lambda x: 'Other' not in x)]
-    
-    # Get unique themes list
-    unique_themes = list(THEMES.keys())
-    matrix = pd.DataFrame(0, index=unique_themes, columns=unique_themes)
+    plt.savefig(path)
+    plt.close('all')
 
-    for themes in df_filtered['themes']:
-        if len(themes) > 1:
-            for i in range(len(themes)):
-                for j in range(i + 1, len(themes)):
-                    t1, t2 = themes[i], themes[j]
-                    if t1 in unique_themes and t2 in unique_themes:
-                        matrix.loc[t1, t2] += 1
-                        matrix.loc[t2, t1] += 1 # Symmetric
 
+def render_cooccurrence_heatmap(cooccurrence, path):
+    """Co-occurrence Heatmap (Insight: How often themes overlap)"""
+    plt, sns = _pyplot()
+    import pandas as pd
+    matrix = pd.DataFrame(cooccurrence['matrix'], index=cooccurrence['themes'], columns=cooccurrence['themes'])
     plt.figure(figsize=(10, 8))
     sns.heatmap(matrix, annot=True, fmt='d', cmap="YlGnBu")
     plt.title('Theme Co-occurrence Heatmap', fontsize=16)
     plt.tight_layout()
-    plt.savefig('viz_5_cooccurrence_heatmap.png')
-    print("  -> Saved 'viz_5_cooccurrence_heatmap.png'")
+    plt.savefig(path)
+    plt.close('all')
+
+
+RENDERERS = {
+    'viz_1_theme_distribution.png': render_theme_distribution,
+    'viz_2_sentiment_boxplot.png': render_sentiment_boxplot,
+    'viz_3_top_phrases.png': render_top_phrases,
+    'viz_4_wordcloud.png': render_wordcloud,
+    'viz_5_cooccurrence_heatmap.png': render_cooccurrence_heatmap,
+}
+
+
+def aggregate_hash(filename, aggregate):
+    """Content hash of a chart's input; bump RENDER_VERSION when a renderer changes."""
+    payload = json.dumps({'chart': filename, 'version': RENDER_VERSION, 'data': aggregate}, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def generate_visualizations(aggregates, output_folder=OUTPUT_FOLDER):
+    """Renders every chart whose aggregate changed since the last run, in parallel."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    print("\n Generating Visualizations: ")
+    cache_path = os.path.join(output_folder, VIZ_CACHE_FILE)
+    cache = {}
+    if os.path.exists(cache_path):
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+
+    pending = {}
+    for filename, aggregate in aggregates.items():
+        path = os.path.join(output_folder, filename)
+        digest = aggregate_hash(filename, aggregate)
+        if cache.get(filename) == digest and os.path.exists(path):
+            print(f"  -> '{filename}' is up to date, skipping")
+            continue
+        pending[filename] = (path, digest)
+
+    failed = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(RENDER_WORKERS, len(pending))) as pool:
+            futures = {
+                filename: pool.submit(RENDERERS[filename], aggregates[filename], path)
+                for filename, (path, _) in pending.items()
+            }
+            for filename, future in futures.items():
+                try:
+                    future.result()
+                except Exception as err:
+                    print(f"  -> Failed to render '{filename}': {err}")
+                    failed.append(filename)
+                    continue
+                # Record each chart as soon as it is drawn, so a failure elsewhere does not redraw it next run
+                cache[filename] = pending[filename][1]
+                with open(cache_path, 'w', encoding='utf-8') as f:
+                    json.dump(cache, f, indent=2)
+                print(f"  -> Saved '{filename}'")
+
+    if not pending:
+        with open(cache_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    if failed:
+        raise RuntimeError(f"Failed to render {', '.join(failed)}")
 
 
 def main():
     # --- 3. LOAD & PREPARE DATA ---
     print(f"Loading data from {INPUT_FOLDER}...")
-    data = load_data(INPUT_FOLDER)
+    with profiler.stage('load'):
+        data = load_data(INPUT_FOLDER)
     if not data:
         print("No data loaded. Please check your INPUT_FILE path and format.")
         return
 
-    df = pd.DataFrame(data)
+    with profiler.stage('load'):
+        import pandas as pd
+        df = pd.DataFrame(data)
+    profiler.count('load', 'posts', len(df))
     print(f"Successfully loaded {len(df)} posts/comments.")
 
     # --- 4. THEMATIC & SENTIMENT ANALYSIS ---
     print("\n--- Running Analysis ---")
-    df['themes'] = df['text'].apply(categorize_text)
-    df['sentiment'] = df['text'].apply(lambda text: analyzer.polarity_scores(text)['compound'])
-    
+    with profiler.stage('tag'):
+        df['themes'] = df['text'].apply(categorize_text)
+    profiler.count('tag', 'posts', len(df))
+    with profiler.stage('sentiment'):
+        analyzer = get_analyzer()
+        df['sentiment'] = df['text'].apply(lambda text: analyzer.polarity_scores(text)['compound'])
+    profiler.count('sentiment', 'posts', len(df))
+
     # Explode the 'themes' list so each theme gets its own row for counting/plotting
-    df_themes_exploded = df.explode('themes')
-    
+    with profiler.stage('tag'):
+        df_themes_exploded = df.explode('themes')
+
     # --- 5. PREPARE WORDS ---
     print("  -> Cleaning text for word analysis...")
-    all_words = []
-    # Using a sample if dataset is massive to speed up dev, remove .sample(n) for full run
-    for words_list in df['text'].apply(clean_text_for_ngrams): 
-        all_words.extend(words_list)
+    # Set SAMPLE_SIZE / SAMPLE_RATE above if the dataset is massive to speed up dev
+    with profiler.stage('ngram'):
+        token_ids = tokenizer.tokenize_all(df['text'])
+    profiler.count('ngram', 'posts', len(token_ids))
 
     # --- 6. GENERATE VISUALIZATIONS ---
-    generate_visualizations(df, df_themes_exploded, all_words)
+    with profiler.stage('aggregate'):
+        aggregates = build_aggregates(df, df_themes_exploded, token_ids)
+    with profiler.stage('render'):
+        generate_visualizations(aggregates)
     print("\nAll visualizations generated successfully.")
 
+    print()
+    profiler.finish(PROFILE_REPORT, PROMETHEUS_TEXTFILE)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
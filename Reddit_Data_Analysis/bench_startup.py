@@ -0,0 +1,79 @@
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# --- 1. CONFIGURATION ---
+# Scripts whose startup is guarded. Importing one must not pull in any HEAVY_MODULES.
+SCRIPTS = ['reddit_data', 'analyze_reddit', 'run_queries', 'analyze_reddit_visuals', 'rollup_cube', 'dedup',
+           'analysis_server', 'build_catalog_index']
+
+# Modules that should only load in the code paths that use them
+HEAVY_MODULES = ['pandas', 'nltk', 'vaderSentiment', 'matplotlib', 'seaborn', 'wordcloud']
+
+# Each script must start (fresh interpreter + import) within this many seconds
+BUDGET_SECONDS = 0.5
+
+# Runs per script; the median is compared against the budget
+RUNS = 5
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs inside the child interpreter: import the script, then report any heavy modules it loaded
+_PROBE = """
+import sys
+import {name}
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(','.join(heavy))
+"""
+
+
+def time_startup(name, cwd):
+    """Starts a fresh interpreter, imports the script and returns (seconds, heavy modules loaded)."""
+    env = dict(os.environ, PYTHONPATH=SCRIPT_DIR, PYTHONDONTWRITEBYTECODE='1')
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', _PROBE.format(name=name, heavy=HEAVY_MODULES)],
+                            cwd=cwd, env=env, capture_output=True, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {name} failed:\n{result.stderr}")
+    heavy = [m for m in result.stdout.strip().split(',') if m]
+    return elapsed, heavy
+
+
+def main():
+    print(f"Startup benchmark: {RUNS} runs per script, budget {BUDGET_SECONDS:.2f}s (median)")
+    baseline = [time_startup('os', SCRIPT_DIR)[0] for _ in range(RUNS)]
+    print(f"  {'(bare interpreter)':<24} {statistics.median(baseline):.3f}s")
+
+    failures = []
+    # Run from a scratch folder so scripts that create log folders on import leave no trace
+    with tempfile.TemporaryDirectory() as cwd:
+        for name in SCRIPTS:
+            times = []
+            heavy = []
+            for _ in range(RUNS):
+                elapsed, heavy = time_startup(name, cwd)
+                times.append(elapsed)
+            median = statistics.median(times)
+            status = "ok"
+            if median > BUDGET_SECONDS:
+                status = "SLOW"
+                failures.append(f"{name} took {median:.3f}s")
+            if heavy:
+                status = "HEAVY"
+                failures.append(f"{name} imported {', '.join(heavy)} at startup")
+            print(f"  {name:<24} {median:.3f}s  {status}")
+
+    if failures:
+        print("\nStartup regressions:")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\nAll scripts start within budget.")
+
+
+if __name__ == "__main__":
+    main()
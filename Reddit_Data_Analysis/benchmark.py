@@ -0,0 +1,205 @@
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+import generate_synthetic_dump
+import reddit_data
+from run_queries import categorize_text, stop_words, THEME_KEYWORDS
+from tokenizer import Tokenizer, top_unigrams, top_bigrams
+from nlp_resources import get_analyzer
+
+# --- 1. CONFIGURATION ---
+# Size of the synthetic dumps the benchmark runs on
+NUM_SUBMISSIONS = 5000
+NUM_COMMENTS = 25000
+
+# Each stage runs this many times; the fastest run is reported
+RUNS = 3
+
+# Saved results to compare against. Baselines are machine specific: record one on the
+# machine that runs the comparison.
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# Set to True to save this run as the new baseline instead of comparing against it
+UPDATE_BASELINE = False
+
+# A stage regresses when its throughput drops by more than this fraction of the baseline
+TOLERANCE = 0.2
+
+# Keep the generated dumps and filtered output here instead of a temporary folder (None to discard)
+KEEP_DATA_FOLDER = None
+
+
+# --- 2. STAGES ---
+def filtered_texts(folder):
+    """Reads the filter output the way the analysis loaders do."""
+    texts = []
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith(".txt"):
+            continue
+        with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+            for line in f:
+                post = json.loads(line)
+                text = (post.get('title', '') + ' ' + post.get('body', post.get('selftext', ''))).lower().strip()
+                if text:
+                    texts.append(text)
+    return texts
+
+
+def run_filter(dumps, output_folder):
+    for path in dumps:
+        name = os.path.splitext(os.path.basename(path))[0]
+        reddit_data.process_file(path, os.path.join(output_folder, name), "txt",
+                                 reddit_data.from_date, reddit_data.to_date, None)
+
+
+def count_lines(dumps):
+    lines = 0
+    for path in dumps:
+        for _ in reddit_data.read_lines_zst(path):
+            lines += 1
+    return lines
+
+
+def tag(texts):
+    for text in texts:
+        categorize_text(text)
+
+
+def score_sentiment(texts):
+    analyzer = get_analyzer()
+    for text in texts:
+        analyzer.polarity_scores(text)
+
+
+def count_ngrams(texts):
+    tokenizer = Tokenizer(stop_words, THEME_KEYWORDS)
+    token_ids = tokenizer.tokenize_all(texts)
+    top_unigrams(token_ids, tokenizer.vocab, 30)
+    top_bigrams(token_ids, tokenizer.vocab, 20)
+
+
+def end_to_end(dumps, output_folder):
+    run_filter(dumps, output_folder)
+    texts = filtered_texts(output_folder)
+    tag(texts)
+    score_sentiment(texts)
+    count_ngrams(texts)
+
+
+def best_of(runs, function, *args):
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_benchmarks(data_folder):
+    dumps = generate_synthetic_dump.generate(os.path.join(data_folder, "dumps"), NUM_SUBMISSIONS, NUM_COMMENTS)
+    filtered_folder = os.path.join(data_folder, "filtered")
+    os.makedirs(filtered_folder, exist_ok=True)
+
+    # Filter once up front so the analysis stages have input
+    run_filter(dumps, filtered_folder)
+    texts = filtered_texts(filtered_folder)
+    total_lines = count_lines(dumps)
+    compressed_mb = sum(os.stat(path).st_size for path in dumps) / 2**20
+    get_analyzer()  # Build the VADER lexicon outside the timed runs
+
+    stages = [
+        ('read_lines_zst', total_lines, 'lines', count_lines, dumps),
+        ('process_file', total_lines, 'lines', run_filter, dumps, filtered_folder),
+        ('categorize_text', len(texts), 'posts', tag, texts),
+        ('vader', len(texts), 'posts', score_sentiment, texts),
+        ('ngram', len(texts), 'posts', count_ngrams, texts),
+        ('end_to_end', total_lines, 'lines', end_to_end, dumps, filtered_folder),
+    ]
+    results = {}
+    for name, items, unit, function, *args in stages:
+        seconds = best_of(RUNS, function, *args)
+        results[name] = {
+            'seconds': round(seconds, 6),
+            'items': items,
+            'unit': unit,
+            'items_per_second': round(items / seconds, 3),
+        }
+        print(f"  {name:<16} {seconds:8.3f}s  {items / seconds:>12,.0f} {unit}/s")
+    results['process_file']['compressed_mb_per_second'] = round(compressed_mb / results['process_file']['seconds'], 3)
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
+
+
+# --- 3. BASELINES ---
+def compare(results, baseline):
+    """Returns a list of regressions against the baseline throughput."""
+    regressions = []
+    print(f"\nCompared with baseline from {baseline.get('recorded', 'unknown date')}:")
+    if baseline.get('environment') != environment():
+        print("  Warning: baseline was recorded in a different environment; numbers may not be comparable.")
+    for name, result in results.items():
+        previous = baseline['stages'].get(name)
+        if previous is None:
+            print(f"  {name:<16} (no baseline)")
+            continue
+        change = result['items_per_second'] / previous['items_per_second'] - 1
+        status = "ok"
+        if change < -TOLERANCE:
+            status = "REGRESSION"
+            regressions.append(f"{name} throughput {change:+.0%}")
+        print(f"  {name:<16} {change:+7.1%}  {status}")
+    return regressions
+
+
+def main():
+    # The progress lines and the planted bad line warnings would drown out the results
+    reddit_data.log.setLevel(logging.ERROR)
+
+    print(f"Benchmarking on {NUM_SUBMISSIONS:,} synthetic submissions and {NUM_COMMENTS:,} comments "
+          f"(best of {RUNS})...")
+    data_folder = KEEP_DATA_FOLDER or tempfile.mkdtemp(prefix="skillbridge_bench_")
+    try:
+        results = run_benchmarks(data_folder)
+    finally:
+        if KEEP_DATA_FOLDER is None:
+            shutil.rmtree(data_folder, ignore_errors=True)
+
+    if UPDATE_BASELINE or not os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({
+                'recorded': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'environment': environment(),
+                'scale': {'submissions': NUM_SUBMISSIONS, 'comments': NUM_COMMENTS},
+                'stages': results,
+            }, f, indent=2)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+        return
+
+    with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline)
+    if regressions:
+        print("\nPerformance regressions:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+
+from filtered_posts import read_posts
+from nlp_resources import load_stop_words
+from tokenizer import PUNCTUATION_RE
+
+# --- 1. CONFIGURATION ---
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The curated catalog the UI draws on, and the prebuilt index written next to it
+CATALOG_FILE = os.path.join(SCRIPT_DIR, "golden_db.json")
+INDEX_FILE = os.path.join(SCRIPT_DIR, "golden_db_index.json")
+
+# CHANGE THIS to the FOLDER containing filtered .txt files. Reddit mention counts are
+# left out of the index (null) when it does not exist.
+INPUT_FOLDER = r"/Users/maitreya/Documents/NEU/CS 5170 - AI for HCI/Code/SkillBridge/reddit_analysis"
+
+# Bump when the index layout changes, so readers can reject an index they do not understand
+INDEX_VERSION = 1
+
+# BM25 parameters for the text index over title, description and why_it_matters
+BM25_K1 = 1.2
+BM25_B = 0.75
+TEXT_FIELDS = ['title', 'description', 'why_it_matters']
+
+# Fields every resource must have (roi_tags is checked separately, it is a list)
+RESOURCE_FIELDS = ['resource_id', 'title', 'url', 'platform', 'cost', 'type', 'description', 'why_it_matters']
+
+# Facets that get an inverted index: index name -> resource field
+FACETS = {'tag': 'roi_tags', 'cost': 'cost', 'platform': 'platform', 'type': 'type'}
+
+# Platforms too generic to count as a mention of anything
+UNCOUNTED_PLATFORMS = {'Self-Directed'}
+
+stop_words = load_stop_words()
+
+
+class CatalogError(ValueError):
+    """The catalog failed validation; the message lists every problem found."""
+
+
+# --- 2. VALIDATION ---
+def _is_text(value):
+    return isinstance(value, str) and value.strip() != ''
+
+
+def validate_catalog(catalog):
+    """Checks the catalog structure and cross references. Raises CatalogError listing every problem.
+
+    Returns a list of warnings (problems that do not stop the build).
+    """
+    errors = []
+    warnings = []
+    if not isinstance(catalog, dict):
+        raise CatalogError("Catalog must be a JSON object with 'resources' and 'pathways'")
+    resources = catalog.get('resources')
+    pathways = catalog.get('pathways')
+    if not isinstance(resources, list):
+        errors.append("'resources' must be a list")
+        resources = []
+    if not isinstance(pathways, list):
+        errors.append("'pathways' must be a list")
+        pathways = []
+
+    resource_ids = set()
+    for i, resource in enumerate(resources):
+        where = f"resources[{i}]"
+        if not isinstance(resource, dict):
+            errors.append(f"{where} must be an object")
+            continue
+        where = f"resource {resource.get('resource_id', where)}"
+        for field in RESOURCE_FIELDS:
+            if not _is_text(resource.get(field)):
+                errors.append(f"{where}: '{field}' must be a non-empty string")
+        tags = resource.get('roi_tags')
+        if not isinstance(tags, list) or not tags or not all(_is_text(tag) for tag in tags):
+            errors.append(f"{where}: 'roi_tags' must be a non-empty list of strings")
+        elif len(set(tags)) != len(tags):
+            warnings.append(f"{where}: duplicate roi_tags")
+        aliases = resource.get('aliases', [])
+        if not isinstance(aliases, list) or not all(_is_text(alias) for alias in aliases):
+            errors.append(f"{where}: 'aliases' must be a list of strings")
+        resource_id = resource.get('resource_id')
+        if not _is_text(resource_id):
+            continue  # Already reported above; a list or dict here could not go in the set anyway
+        if resource_id in resource_ids:
+            errors.append(f"{where}: duplicate resource_id")
+        resource_ids.add(resource_id)
+
+    pathway_ids = set()
+    referenced = set()
+    for i, pathway in enumerate(pathways):
+        where = f"pathways[{i}]"
+        if not isinstance(pathway, dict):
+            errors.append(f"{where} must be an object")
+            continue
+        where = f"pathway {pathway.get('pathway_id', where)}"
+        for field in ['pathway_id', 'title']:
+            if not _is_text(pathway.get(field)):
+                errors.append(f"{where}: '{field}' must be a non-empty string")
+        pathway_id = pathway.get('pathway_id')
+        if _is_text(pathway_id):
+            if pathway_id in pathway_ids:
+                errors.append(f"{where}: duplicate pathway_id")
+            pathway_ids.add(pathway_id)
+        steps = pathway.get('steps')
+        if not isinstance(steps, list) or not steps:
+            errors.append(f"{where}: 'steps' must be a non-empty list")
+            continue
+        for j, step in enumerate(steps):
+            if not isinstance(step, dict):
+                errors.append(f"{where}: steps[{j}] must be an object")
+                continue
+            if step.get('step') != j + 1:
+                errors.append(f"{where}: steps[{j}] should be step {j + 1}, found {step.get('step')!r}")
+            if not _is_text(step.get('title')):
+                errors.append(f"{where}: step {j + 1} needs a title")
+            ids = step.get('resource_ids')
+            if not isinstance(ids, list) or not ids:
+                errors.append(f"{where}: step {j + 1} must list at least one resource_id")
+                continue
+            for resource_id in ids:
+                if not _is_text(resource_id):
+                    errors.append(f"{where}: step {j + 1} resource_ids must be strings, found {resource_id!r}")
+                    continue
+                if resource_id not in resource_ids:
+                    errors.append(f"{where}: step {j + 1} links unknown resource '{resource_id}'")
+                referenced.add(resource_id)
+
+    for resource_id in sorted(resource_ids - referenced, key=str):
+        warnings.append(f"resource {resource_id} is not part of any pathway")
+
+    if errors:
+        raise CatalogError("Catalog validation failed:\n  - " + "\n  - ".join(errors))
+    return warnings
+
+
+# --- 3. INDEXES ---
+def tokenize(text):
+    """Same normalization as the analysis tokenizer: lowercase, drop punctuation, drop stop words."""
+    return [word for word in PUNCTUATION_RE.sub('', text.lower()).split() if word not in stop_words]
+
+
+def facet_indexes(resources):
+    """Inverted index per facet: value -> positions of the resources that have it."""
+    indexes = {name: {} for name in FACETS}
+    for position, resource in enumerate(resources):
+        for name, field in FACETS.items():
+            values = resource[field] if isinstance(resource[field], list) else [resource[field]]
+            for value in dict.fromkeys(values):
+                indexes[name].setdefault(value, []).append(position)
+    return {name: dict(sorted(index.items())) for name, index in indexes.items()}
+
+
+def bm25_index(resources, k1=BM25_K1, b=BM25_B):
+    """BM25 index over TEXT_FIELDS. Each posting holds the term's finished score for that resource,
+    so a query only has to add up the postings of its terms."""
+    documents = [tokenize(' '.join(resource[field] for field in TEXT_FIELDS)) for resource in resources]
+    lengths = [len(words) for words in documents]
+    avgdl = sum(lengths) / len(lengths) if lengths else 0.0
+    term_counts = [Counter(words) for words in documents]
+    document_frequency = Counter(term for counts in term_counts for term in counts)
+
+    idf = {term: math.log(1 + (len(documents) - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()}
+    postings = {term: [] for term in sorted(document_frequency)}
+    for position, counts in enumerate(term_counts):
+        norm = k1 * (1 - b + b * lengths[position] / avgdl)
+        for term, tf in counts.items():
+            postings[term].append([position, round(idf[term] * tf * (k1 + 1) / (tf + norm), 4)])
+    return {'k1': k1, 'b': b, 'fields': TEXT_FIELDS, 'avgdl': round(avgdl, 4), 'postings': postings}
+
+
+def resolve_pathways(pathways, positions):
+    """Pathways with resource ids replaced by resource positions, plus the reverse resource -> pathways links."""
+    resolved = []
+    resource_pathways = {}
+    for pathway in pathways:
+        steps = []
+        for step in pathway['steps']:
+            steps.append({'step': step['step'], 'title': step['title'],
+                          'resources': [positions[resource_id] for resource_id in step['resource_ids']]})
+            for resource_id in step['resource_ids']:
+                links = resource_pathways.setdefault(resource_id, [])
+                if pathway['pathway_id'] not in links:
+                    links.append(pathway['pathway_id'])
+        resolved.append({
+            'pathway_id': pathway['pathway_id'],
+            'title': pathway['title'],
+            'target_persona_desc': pathway.get('target_persona_desc', ''),
+            'steps': steps,
+        })
+    return resolved, resource_pathways
+
+
+# --- 4. REDDIT MENTIONS ---
+def normalize_mention_text(text):
+    return ' '.join(PUNCTUATION_RE.sub(' ', text.lower()).split())
+
+
+def count_mentions(resources, folder_path):
+    """Counts, in a single pass over the filtered corpus, the posts naming each resource and platform.
+
+    A resource is named by its title or one of its optional 'aliases'; a post counts once per resource.
+    All names are matched together by one compiled pattern, so each post is scanned once.
+    """
+    targets = {}  # normalized name -> [('resource', id) / ('platform', name)]
+    for resource in resources:
+        for name in [resource['title']] + resource.get('aliases', []):
+            targets.setdefault(normalize_mention_text(name), []).append(('resource', resource['resource_id']))
+        if resource['platform'] not in UNCOUNTED_PLATFORMS:
+            target = ('platform', resource['platform'])
+            names = targets.setdefault(normalize_mention_text(resource['platform']), [])
+            if target not in names:
+                names.append(target)
+    # Longest names first, so a full title wins over the platform name it starts with
+    pattern = re.compile(r'\b(?:' + '|'.join(re.escape(name) for name in sorted(targets, key=len, reverse=True)
+                                            if name) + r')\b')
+
+    platform_of = {resource['resource_id']: resource['platform'] for resource in resources}
+    resource_counts = Counter()
+    platform_counts = Counter()
+    posts = 0
+    for post in read_posts(folder_path):
+        posts += 1
+        text = normalize_mention_text(post.get('title', '') + ' ' + post.get('body', post.get('selftext', '')))
+        found = set()
+        for match in pattern.finditer(text):
+            found.update(targets[match.group(0)])
+        if not found:
+            continue
+        named = {key for kind, key in found if kind == 'resource'}
+        # Naming a resource also names its platform
+        platforms = {key for kind, key in found if kind == 'platform'} | {platform_of[key] for key in named}
+        resource_counts.update(named)
+        platform_counts.update(platforms - UNCOUNTED_PLATFORMS)
+    return {
+        'corpus_posts': posts,
+        'resources': {resource['resource_id']: resource_counts[resource['resource_id']] for resource in resources},
+        'platforms': {platform: platform_counts[platform]
+                      for platform in sorted({r['platform'] for r in resources} - UNCOUNTED_PLATFORMS)},
+    }
+
+
+# --- 5. BUILD ---
+def build_index(catalog, catalog_hash, mentions=None):
+    resources = catalog['resources']
+    positions = {resource['resource_id']: position for position, resource in enumerate(resources)}
+    pathways, resource_pathways = resolve_pathways(catalog['pathways'], positions)
+    return {
+        'version': INDEX_VERSION,
+        'catalog_sha256': catalog_hash,
+        # Indexes refer to resources by their position in this list
+        'resources': [
+            dict(resource,
+                 pathways=resource_pathways.get(resource['resource_id'], []),
+                 reddit_mentions=None if mentions is None else mentions['resources'][resource['resource_id']])
+            for resource in resources
+        ],
+        'resource_positions': positions,
+        'facets': facet_indexes(resources),
+        'text': bm25_index(resources),
+        'pathways': pathways,
+        'reddit': mentions,
+    }
+
+
+def search(index, query='', tag=None, cost=None, platform=None, type=None, limit=10):
+    """Faceted BM25 search against a built index. Facet filters are ANDed; tag may be a list.
+
+    With no query text, matches are ranked by Reddit mentions, then catalog order.
+    """
+    candidates = None
+    for name, values in (('tag', tag), ('cost', cost), ('platform', platform), ('type', type)):
+        if values is None:
+            continue
+        for value in values if isinstance(values, list) else [values]:
+            matching = set(index['facets'][name].get(value, []))
+            candidates = matching if candidates is None else candidates & matching
+    if candidates is None:
+        candidates = set(range(len(index['resources'])))
+
+    scores = Counter()
+    terms = tokenize(query)
+    for term in terms:
+        for position, score in index['text']['postings'].get(term, []):
+            if position in candidates:
+                scores[position] += score
+    if terms:
+        ranked = sorted(scores, key=lambda position: (-scores[position], position))
+    else:
+        ranked = sorted(candidates, key=lambda position: (-(index['resources'][position]['reddit_mentions'] or 0),
+                                                          position))
+    return [dict(index['resources'][position], score=round(scores[position], 4)) for position in ranked[:limit]]
+
+
+def main():
+    print(f"Validating {CATALOG_FILE}...")
+    with open(CATALOG_FILE, 'rb') as f:
+        raw = f.read()
+    catalog = json.loads(raw)
+    for warning in validate_catalog(catalog):
+        print(f"  Warning: {warning}")
+    print(f"  {len(catalog['resources'])} resources and {len(catalog['pathways'])} pathways are valid.")
+
+    mentions = None
+    if os.path.isdir(INPUT_FOLDER):
+        print(f"Counting Reddit mentions in {INPUT_FOLDER}...")
+        mentions = count_mentions(catalog['resources'], INPUT_FOLDER)
+        print(f"  Scanned {mentions['corpus_posts']:,} posts/comments.")
+    else:
+        print(f"Input folder {INPUT_FOLDER} not found; building the index without Reddit mention counts.")
+
+    index = build_index(catalog, hashlib.sha256(raw).hexdigest(), mentions)
+    # Write then rename, so the UI never reads a half-written index
+    tmp_path = INDEX_FILE + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, INDEX_FILE)
+    print(f"Index written to {INDEX_FILE} ({os.stat(INDEX_FILE).st_size / 1024:,.1f} KB, "
+          f"{len(index['text']['postings'])} terms, {sum(len(v) for v in index['facets'].values())} facet values)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+import json
+import math
+import os
+import zlib
+from collections import OrderedDict
+from hashlib import blake2b
+
+import numpy as np
+
+from tokenizer import PUNCTUATION_RE
+
+# --- 1. CONFIGURATION ---
+# CHANGE THIS to the FOLDER containing filtered .txt files from reddit_data.py
+INPUT_FOLDER = r"/Users/maitreya/Documents/NEU/CS 5170 - AI for HCI/Code/SkillBridge/reddit_analysis"
+
+# Deduplicated files are written here under the same names
+OUTPUT_FOLDER = r"/Users/maitreya/Documents/NEU/CS 5170 - AI for HCI/Code/SkillBridge/reddit_analysis_dedup"
+
+# "drop" leaves duplicates out of the output, "mark" keeps them with a "_duplicate" field
+# ("exact" or "near") that the analysis loaders skip
+MODE = "drop"
+
+# Posts with Jaccard similarity (over word shingles) at or above this are near-duplicates
+SIMILARITY_THRESHOLD = 0.8
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Number of MinHash permutations; bands and rows are derived from this and the threshold
+NUM_PERM = 64
+
+# Posts shorter than this many words are never treated as duplicates ("thanks!", "this")
+MIN_WORDS = 8
+
+# Near-duplicates are looked up among this many most recent unique posts. Memory for
+# near-duplicate detection is bounded by this, not by the size of the corpus.
+WINDOW_SIZE = 100000
+
+# Exact duplicates are found across the whole corpus (not just the window) with a Bloom filter
+# sized for about this many posts (posts that reach the deduplicator, i.e. after the
+# keyword/date filter). A false positive drops a unique post as an exact duplicate, so the rate
+# is kept very low: 1e-6 costs about 29 bits per post (~7 MB for 2M posts). The summary reports
+# the expected number of such false drops.
+EXPECTED_POSTS = 2000000
+EXACT_FALSE_POSITIVE_RATE = 1e-6
+
+# Largest prime below 2**32, so a * x + b for the MinHash permutations fits in uint64
+_PRIME = np.uint64(4294967291)
+_SEED = 42
+
+
+# --- 2. HELPERS ---
+def post_text(obj):
+    """Title plus body/selftext, the same text the filter and analysis scripts look at."""
+    return obj.get('title', '') + ' ' + obj.get('body', obj.get('selftext', ''))
+
+
+def normalize_words(text):
+    return PUNCTUATION_RE.sub('', text.lower()).split()
+
+
+def lsh_params(threshold, num_perm):
+    """Picks the (bands, rows) split whose S-curve crosses 1/2 closest to the threshold."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        crossing = (1.0 / bands) ** (1.0 / rows)
+        if best is None or abs(crossing - threshold) < best[0]:
+            best = (abs(crossing - threshold), bands, rows)
+    return best[1], best[2]
+
+
+class BloomFilter:
+    """Fixed-size set membership with a small false positive rate."""
+
+    def __init__(self, capacity, false_positive_rate):
+        self.capacity = capacity
+        self.num_bits = max(8, int(-capacity * math.log(false_positive_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+
+    def false_positive_rate(self, count):
+        """Chance that a new item is reported as present once count distinct items were added."""
+        return (1 - math.exp(-self.num_hashes * count / self.num_bits)) ** self.num_hashes
+
+    def add(self, digest):
+        """Adds a 16-byte digest. Returns True if it was (probably) already present."""
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:16], 'little') | 1
+        present = True
+        for i in range(self.num_hashes):
+            bit = (h1 + i * h2) % self.num_bits
+            byte, mask = bit >> 3, 1 << (bit & 7)
+            if not self.bits[byte] & mask:
+                present = False
+                self.bits[byte] |= mask
+        return present
+
+
+class Deduplicator:
+    """Streaming exact and near-duplicate detector.
+
+    Exact duplicates are screened with a Bloom filter of content hashes and confirmed
+    against the content hashes of the window; near-duplicates are found with MinHash
+    signatures bucketed by LSH over a sliding window of recent posts.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, num_perm=NUM_PERM, shingle_size=SHINGLE_SIZE,
+                 min_words=MIN_WORDS, window_size=WINDOW_SIZE,
+                 expected_posts=EXPECTED_POSTS, exact_false_positive_rate=EXACT_FALSE_POSITIVE_RATE):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.window_size = window_size
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        rng = np.random.default_rng(_SEED)
+        self._a = rng.integers(1, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), size=(num_perm, 1), dtype=np.uint64)
+        self._exact = BloomFilter(expected_posts, exact_false_positive_rate)
+        # seq -> (post id, signature, band keys, content digest); oldest first
+        self._window = OrderedDict()
+        self._buckets = [{} for _ in range(self.bands)]
+        # content digest -> seq, for the posts in the window
+        self._digests = {}
+        self._seq = 0
+        self.stats = {'seen': 0, 'exact': 0, 'near': 0}
+        # Distinct contents added to the Bloom filter, and the sum of its false positive
+        # chance over every post checked
+        self._distinct = 0
+        self.expected_false_positives = 0.0
+
+    def _signature(self, words):
+        shingles = {' '.join(words[i:i + self.shingle_size]) for i in range(max(1, len(words) - self.shingle_size + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64, count=len(shingles))
+        return ((self._a * hashes + self._b) % _PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature):
+        return [hash(signature[i * self.rows:(i + 1) * self.rows].tobytes()) for i in range(self.bands)]
+
+    def _remember(self, post_id, signature, keys, digest):
+        seq = self._seq
+        self._seq += 1
+        self._window[seq] = (post_id, signature, keys, digest)
+        self._digests[digest] = seq
+        for bucket, key in zip(self._buckets, keys):
+            bucket[key] = seq
+        if len(self._window) > self.window_size:
+            old_seq, (_, _, old_keys, old_digest) = self._window.popitem(last=False)
+            for bucket, key in zip(self._buckets, old_keys):
+                if bucket.get(key) == old_seq:
+                    del bucket[key]
+            if self._digests.get(old_digest) == old_seq:
+                del self._digests[old_digest]
+
+    def check(self, obj):
+        """Returns (kind, duplicate_of) for a post, where kind is None, "exact" or "near".
+
+        duplicate_of is the id of the earlier post when it is still in the window, else None.
+        """
+        self.stats['seen'] += 1
+        words = normalize_words(post_text(obj))
+        if len(words) < self.min_words:
+            return None, None
+
+        digest = blake2b(' '.join(words).encode('utf-8'), digest_size=16).digest()
+        self.expected_false_positives += self._exact.false_positive_rate(self._distinct)
+        if self._exact.add(digest):
+            self.stats['exact'] += 1
+            seq = self._digests.get(digest)
+            return 'exact', None if seq is None else self._window[seq][0]
+        self._distinct += 1
+
+        signature = self._signature(words)
+        keys = self._band_keys(signature)
+        checked = set()
+        for bucket, key in zip(self._buckets, keys):
+            seq = bucket.get(key)
+            if seq is None or seq in checked:
+                continue
+            checked.add(seq)
+            other_id, other_signature, _, _ = self._window[seq]
+            if np.mean(signature == other_signature) >= self.threshold:
+                self.stats['near'] += 1
+                return 'near', other_id
+
+        self._remember(obj.get('id'), signature, keys, digest)
+        return None, None
+
+    def is_duplicate(self, obj):
+        """True if the post should be dropped as an exact or near-duplicate."""
+        return self.check(obj)[0] is not None
+
+    def summary(self):
+        stats = self.stats
+        line = (f"Seen {stats['seen']:,} : exact duplicates {stats['exact']:,} : near duplicates {stats['near']:,} : "
+                f"unique {stats['seen'] - stats['exact'] - stats['near']:,} : "
+                f"~{self.expected_false_positives:,.3f} unique posts expected to be dropped by Bloom false positives")
+        if self._distinct > self._exact.capacity:
+            line += f" : Bloom filter over capacity ({self._distinct:,} > {self._exact.capacity:,}), raise EXPECTED_POSTS"
+        return line
+
+
+# --- 3. STREAMING ---
+def dedup_lines(lines, deduplicator, mode=MODE):
+    """Yields the JSONL lines to keep, marking or dropping duplicates."""
+    for line in lines:
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        kind, duplicate_of = deduplicator.check(obj)
+        if kind is None:
+            yield line.rstrip('\n')
+        elif mode == "mark":
+            obj['_duplicate'] = kind
+            if duplicate_of is not None:
+                obj['_duplicate_of'] = duplicate_of
+            yield json.dumps(obj)
+
+
+def main():
+    print(f"Deduplicating files from {INPUT_FOLDER} into {OUTPUT_FOLDER} (mode: {MODE})...")
+    if not os.path.isdir(INPUT_FOLDER):
+        print(f"Error: Path is not a valid folder: {INPUT_FOLDER}")
+        return
+    if not os.path.exists(OUTPUT_FOLDER):
+        os.makedirs(OUTPUT_FOLDER)
+
+    # One deduplicator across all files, so reposts across subreddits are caught too
+    deduplicator = Deduplicator()
+    print(f"  LSH: {deduplicator.bands} bands x {deduplicator.rows} rows, threshold {SIMILARITY_THRESHOLD}")
+    for filename in sorted(os.listdir(INPUT_FOLDER)):
+        if not filename.endswith(('.txt', '.jsonl')):
+            continue
+        print(f"  -> Deduplicating {filename}...")
+        with open(os.path.join(INPUT_FOLDER, filename), 'r', encoding='utf-8') as f_in, \
+                open(os.path.join(OUTPUT_FOLDER, filename), 'w', encoding='utf-8') as f_out:
+            for line in dedup_lines(f_in, deduplicator, mode=MODE):
+                f_out.write(line)
+                f_out.write("\n")
+
+    print(deduplicator.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+import json
+import os
+
+
+def read_posts(folder_path):
+    """Yields every parsed post/comment from the .txt (JSONL) files in a folder."""
+    for filename in os.listdir(folder_path):
+        if filename.endswith(".txt"):
+            filepath = os.path.join(folder_path, filename)
+            print(f"  -> Loading {filename}...")
+            with open(filepath, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        post = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if post.get('_duplicate'):
+                        continue  # Marked by dedup.py
+                    yield post
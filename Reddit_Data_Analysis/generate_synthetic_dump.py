@@ -0,0 +1,196 @@
+import json
+import math
+import os
+import random
+import zlib
+from datetime import datetime, timezone
+
+import zstandard
+
+# --- 1. CONFIGURATION ---
+# Where the synthetic .zst files are written
+OUTPUT_FOLDER = "synthetic_dumps"
+
+# Number of submissions and comments to generate
+NUM_SUBMISSIONS = 20000
+NUM_COMMENTS = 100000
+
+# Fraction of posts/comments that match the reddit_data.py keyword filter (real filtered
+# subreddits run at roughly 5-15%). Every other post is generated so that it does not match.
+KEYWORD_DENSITY = 0.1
+
+# Fraction of lines that are malformed JSON, to exercise the bad line path
+BAD_LINE_RATE = 0.0005
+
+# Date range of created_utc; wider than the filter range so the date filter has work to do
+FROM_DATE = datetime(2021, 6, 1, tzinfo=timezone.utc)
+TO_DATE = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+SEED = 5170
+
+SUBREDDITS = [
+    'cscareerquestions', 'careerguidance', 'learnprogramming', 'datascience', 'ITCareerQuestions',
+    'careeradvice', 'jobs', 'resumes', 'QualityAssurance', 'dataanalysis', 'MachineLearning', 'webdev',
+]
+
+# Filler vocabulary; together with the stop words this gives a Zipf-like word distribution.
+# Words containing a filter keyword are left out when the text generator is built.
+FILLER_WORDS = (
+    "job work career company team manager interview offer salary year experience role skills "
+    "learn learning course python javascript sql data analyst engineer software developer code "
+    "project resume apply applied position hiring market remote office boss time money pay "
+    "school degree college university stuck feel think know want need help advice question "
+    "people good great bad hard easy really just like also still even much many first new old "
+    "tech industry field entry level senior junior internship portfolio github linkedin network "
+    "week month day hours start started switch change move moving study studying certification"
+).split()
+
+
+# --- 2. TEXT GENERATION ---
+class TextGenerator:
+    def __init__(self, rng, keywords):
+        from nlp_resources import load_stop_words
+        self.rng = rng
+        # No generated word may contain a keyword on its own, or the keyword density drifts
+        words = [word for word in sorted(load_stop_words()) + FILLER_WORDS
+                 if not any(keyword in word for keyword in keywords)]
+        rng.shuffle(words)
+        self.words = words
+        # Zipf weights: the word at rank r is drawn with weight 1 / r
+        total = 0.0
+        self.cum_weights = []
+        for rank in range(1, len(words) + 1):
+            total += 1.0 / rank
+            self.cum_weights.append(total)
+
+    def length(self, median_words, sigma):
+        """Log-normal word count, which matches the long tail of real post lengths."""
+        return max(1, int(self.rng.lognormvariate(math.log(median_words), sigma)))
+
+    def text(self, num_words, keyword=None):
+        words = self.rng.choices(self.words, cum_weights=self.cum_weights, k=num_words)
+        if keyword is not None:
+            words.insert(self.rng.randrange(len(words) + 1), keyword)
+        sentences = []
+        for start in range(0, len(words), 12):
+            sentence = ' '.join(words[start:start + 12])
+            sentences.append(sentence[:1].upper() + sentence[1:] + self.rng.choice('..?!'))
+        return ' '.join(sentences)
+
+
+def random_id(rng):
+    return ''.join(rng.choices('abcdefghijklmnopqrstuvwxyz0123456789', k=7))
+
+
+def random_created(rng):
+    start, end = int(FROM_DATE.timestamp()), int(TO_DATE.timestamp())
+    return rng.randint(start, end)
+
+
+def make_submission(rng, gen, keyword=None):
+    post_id = random_id(rng)
+    subreddit = rng.choice(SUBREDDITS)
+    created = random_created(rng)
+    is_self = rng.random() < 0.7
+    has_selftext = is_self and rng.random() < 0.9
+    # The keyword, if any, goes into the selftext when there is one, otherwise into the title
+    title = gen.text(gen.length(10, 0.5), None if has_selftext else keyword).rstrip('.?!')
+    selftext = gen.text(gen.length(120, 1.0), keyword) if has_selftext else ""
+    permalink = f"/r/{subreddit}/comments/{post_id}/{'_'.join(title.lower().split()[:6])}/"
+    return {
+        'id': post_id,
+        'name': f"t3_{post_id}",
+        'author': f"user_{rng.randrange(200000)}",
+        'subreddit': subreddit,
+        'subreddit_id': f"t5_{zlib.crc32(subreddit.encode()) % 10**6:x}",
+        'created_utc': created,
+        'retrieved_on': created + rng.randint(60, 86400 * 30),
+        'title': title,
+        'selftext': selftext,
+        'is_self': is_self,
+        'url': f"https://www.reddit.com{permalink}" if is_self else f"https://example.com/{random_id(rng)}",
+        'permalink': permalink,
+        'score': int(rng.paretovariate(1.2)) - 1,
+        'num_comments': int(rng.paretovariate(1.1)) - 1,
+        'over_18': False,
+        'stickied': False,
+        'link_flair_text': rng.choice([None, 'Discussion', 'Question', 'Advice', 'Rant']),
+    }
+
+
+def make_comment(rng, gen, submission_ids, keyword=None):
+    comment_id = random_id(rng)
+    link_id = rng.choice(submission_ids)
+    subreddit = rng.choice(SUBREDDITS)
+    created = random_created(rng)
+    return {
+        'id': comment_id,
+        'link_id': f"t3_{link_id}",
+        'parent_id': f"t3_{link_id}" if rng.random() < 0.5 else f"t1_{random_id(rng)}",
+        'author': f"user_{rng.randrange(200000)}",
+        'subreddit': subreddit,
+        'created_utc': created,
+        'retrieved_on': created + rng.randint(60, 86400 * 30),
+        'body': gen.text(gen.length(35, 1.1), keyword),
+        'score': int(rng.paretovariate(1.3)) - 1,
+        'controversiality': int(rng.random() < 0.03),
+        'gilded': 0,
+        'distinguished': None,
+        'stickied': False,
+        'permalink': f"/r/{subreddit}/comments/{link_id}/_/{comment_id}/",
+    }
+
+
+def write_zst(path, objects, rng, bad_line_rate):
+    """Writes one JSON object per line into a zstandard file, like the Pushshift dumps."""
+    with open(path, 'wb') as f:
+        with zstandard.ZstdCompressor(level=3).stream_writer(f) as writer:
+            for obj in objects:
+                line = json.dumps(obj)
+                if rng.random() < bad_line_rate:
+                    line = line[:len(line) // 2]  # Truncated line, like a damaged dump
+                writer.write(line.encode('utf-8'))
+                writer.write(b"\n")
+
+
+def generate(output_folder, num_submissions=NUM_SUBMISSIONS, num_comments=NUM_COMMENTS,
+             keyword_density=KEYWORD_DENSITY, bad_line_rate=BAD_LINE_RATE, seed=SEED):
+    """Writes a submissions and a comments dump. Returns their paths."""
+    from reddit_data import KEYWORDS, matches_keywords
+    if not os.path.exists(output_folder):
+        os.makedirs(output_folder)
+    rng = random.Random(seed)
+    gen = TextGenerator(rng, KEYWORDS)
+
+    def objects(make, count):
+        for _ in range(count):
+            keyword = rng.choice(KEYWORDS) if rng.random() < keyword_density else None
+            obj = make(keyword)
+            # Random words can still line up into a phrase like "career change"; redraw those
+            while keyword is None and matches_keywords(obj):
+                obj = make(None)
+            yield obj
+
+    submission_ids = []
+
+    def submissions():
+        for submission in objects(lambda keyword: make_submission(rng, gen, keyword), num_submissions):
+            submission_ids.append(submission['id'])
+            yield submission
+
+    submissions_path = os.path.join(output_folder, "synthetic_submissions.zst")
+    comments_path = os.path.join(output_folder, "synthetic_comments.zst")
+    write_zst(submissions_path, submissions(), rng, bad_line_rate)
+    write_zst(comments_path, objects(lambda keyword: make_comment(rng, gen, submission_ids or ['0'], keyword),
+                                     num_comments), rng, bad_line_rate)
+    return submissions_path, comments_path
+
+
+def main():
+    print(f"Generating {NUM_SUBMISSIONS:,} submissions and {NUM_COMMENTS:,} comments into {OUTPUT_FOLDER}...")
+    for path in generate(OUTPUT_FOLDER):
+        print(f"  -> Wrote {path} ({os.stat(path).st_size / 2**20:,.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
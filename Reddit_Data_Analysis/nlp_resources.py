@@ -0,0 +1,21 @@
+import os
+
+# NLTK's English stop word list, bundled so the scripts never need to download it
+STOP_WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stopwords_english.txt')
+
+_analyzer = None
+
+
+def load_stop_words(path=STOP_WORDS_FILE):
+    """Reads the bundled stop word list (one word per line)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return set(line.strip() for line in f if line.strip())
+
+
+def get_analyzer():
+    """Returns the shared VADER analyzer, importing and building it on first use."""
+    global _analyzer
+    if _analyzer is None:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    return _analyzer
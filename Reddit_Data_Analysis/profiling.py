@@ -0,0 +1,167 @@
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; peak RSS is reported as null there
+    resource = None
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process, or None where it cannot be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Stage:
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = None
+        self.calls = 0
+        self.counters = {}
+        # counters that are plain totals, with no per-second rate worth reporting
+        self.totals_only = set()
+
+
+class StageProfiler:
+    """Collects wall time, CPU time and item counts per pipeline stage.
+
+    Coarse stages use `with profiler.stage(name):`, which records wall and CPU time.
+    Per-line stages inside hot loops call add(name, wall) with a perf_counter delta
+    instead, since reading the CPU clock costs several times more than perf_counter.
+    """
+
+    def __init__(self, script):
+        self.script = script
+        self.stages = {}
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        self.info = {}
+
+    def _stage(self, name):
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = Stage()
+        return stage
+
+    @contextmanager
+    def stage(self, name):
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield self
+        finally:
+            stage = self._stage(name)
+            stage.wall += time.perf_counter() - wall
+            stage.cpu = (stage.cpu or 0.0) + time.process_time() - cpu
+            stage.calls += 1
+
+    def add(self, name, wall, cpu=None, calls=1):
+        stage = self._stage(name)
+        stage.wall += wall
+        if cpu is not None:
+            stage.cpu = (stage.cpu or 0.0) + cpu
+        stage.calls += calls
+
+    def count(self, name, counter, amount=1, rate=True):
+        """Adds to a named counter (lines, matched, posts...) of a stage."""
+        stage = self._stage(name)
+        stage.counters[counter] = stage.counters.get(counter, 0) + amount
+        if not rate:
+            stage.totals_only.add(counter)
+
+    def report(self):
+        """Returns the report as a plain dict, with per-second rates for every counter."""
+        stages = {}
+        for name, stage in self.stages.items():
+            entry = {'wall_seconds': round(stage.wall, 6), 'calls': stage.calls,
+                     'cpu_seconds': None if stage.cpu is None else round(stage.cpu, 6)}
+            for counter, amount in stage.counters.items():
+                entry[counter] = amount
+                if stage.wall > 0 and counter not in stage.totals_only:
+                    entry[f"{counter}_per_second"] = round(amount / stage.wall, 3)
+            stages[name] = entry
+        return {
+            'script': self.script,
+            'wall_seconds': round(time.perf_counter() - self.started, 6),
+            'cpu_seconds': round(time.process_time() - self.started_cpu, 6),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'info': self.info,
+            'stages': stages,
+        }
+
+    def summary_lines(self):
+        report = self.report()
+        lines = [f"Profile for {self.script}: {report['wall_seconds']:.2f}s wall, {report['cpu_seconds']:.2f}s CPU"]
+        if report['peak_rss_bytes'] is not None:
+            lines[0] += f", peak RSS {report['peak_rss_bytes'] / 2**20:,.0f} MB"
+        for name, stage in report['stages'].items():
+            cpu = '' if stage['cpu_seconds'] is None else f" / {stage['cpu_seconds']:.2f}s CPU"
+            rates = ', '.join(f"{key[:-len('_per_second')]} {value:,.0f}/s"
+                              for key, value in stage.items() if key.endswith('_per_second'))
+            lines.append(f"  {name:<12} {stage['wall_seconds']:8.2f}s wall{cpu}{'  ' + rates if rates else ''}")
+        return lines
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def write_prometheus(self, path):
+        """Writes the report in the Prometheus textfile collector format."""
+        report = self.report()
+        script = self.script
+        lines = [
+            '# HELP skillbridge_run_wall_seconds Wall time of the whole run.',
+            '# TYPE skillbridge_run_wall_seconds gauge',
+            f'skillbridge_run_wall_seconds{{script="{script}"}} {report["wall_seconds"]}',
+            '# HELP skillbridge_run_cpu_seconds CPU time of the whole run.',
+            '# TYPE skillbridge_run_cpu_seconds gauge',
+            f'skillbridge_run_cpu_seconds{{script="{script}"}} {report["cpu_seconds"]}',
+        ]
+        if report['peak_rss_bytes'] is not None:
+            lines += [
+                '# HELP skillbridge_peak_rss_bytes Peak resident set size of the run.',
+                '# TYPE skillbridge_peak_rss_bytes gauge',
+                f'skillbridge_peak_rss_bytes{{script="{script}"}} {report["peak_rss_bytes"]}',
+            ]
+        lines += [
+            '# HELP skillbridge_stage_wall_seconds Wall time spent per stage.',
+            '# TYPE skillbridge_stage_wall_seconds gauge',
+        ]
+        lines += [f'skillbridge_stage_wall_seconds{{script="{script}",stage="{name}"}} {stage["wall_seconds"]}'
+                  for name, stage in report['stages'].items()]
+        lines += [
+            '# HELP skillbridge_stage_cpu_seconds CPU time spent per stage, where measured.',
+            '# TYPE skillbridge_stage_cpu_seconds gauge',
+        ]
+        lines += [f'skillbridge_stage_cpu_seconds{{script="{script}",stage="{name}"}} {stage["cpu_seconds"]}'
+                  for name, stage in report['stages'].items() if stage['cpu_seconds'] is not None]
+        lines += [
+            '# HELP skillbridge_stage_items Items handled per stage in the last run.',
+            '# TYPE skillbridge_stage_items gauge',
+        ]
+        for name, stage in self.stages.items():
+            for counter, amount in stage.counters.items():
+                lines.append(f'skillbridge_stage_items{{script="{script}",stage="{name}",counter="{counter}"}} {amount}')
+        # Write then rename, so the collector never reads a half-written file
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        os.replace(tmp_path, path)
+
+    def finish(self, json_path=None, prometheus_path=None, log=print):
+        """Logs the summary and writes whichever reports are configured."""
+        for line in self.summary_lines():
+            log(line)
+        if json_path:
+            self.write_json(json_path)
+            log(f"Profile report written to {json_path}")
+        if prometheus_path:
+            self.write_prometheus(prometheus_path)
+            log(f"Prometheus metrics written to {prometheus_path}")
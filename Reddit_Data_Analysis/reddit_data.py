@@ -6,6 +6,9 @@ import csv
 from datetime import datetime
 import logging.handlers
 import traceback
+import time
+from sampling import keep_by_rate
+from profiling import StageProfiler
 
 # put the path to the input file, or a folder of files to process all of
 # *** SET THIS TO YOUR FOLDER OF ZST FILES ***
@@ -24,6 +27,20 @@ single_field = None
 # set this to true to write out to the log every time there's a bad line
 write_bad_lines = True
 
+# set this to true to drop exact and near-duplicate posts/comments (reposts, copy-pastes, bot
+# boilerplate) as they are filtered. Thresholds are configured in dedup.py
+deduplicate = False
+
+# set this to a fraction (e.g. 0.01) to keep only a reproducible sample of the input for fast dev runs.
+# Lines are picked by a hash of the post id, so the same ones are kept on every run
+sample_rate = None
+
+# write a JSON report of per-stage wall/CPU time, throughput and peak memory to this path (None to skip)
+profile_report = None
+
+# write the same metrics in the Prometheus textfile collector format to this path (None to skip)
+prometheus_textfile = None
+
 # only output items between these two dates
 # *** DATE FILTER SET AS REQUESTED ***
 from_date = datetime.strptime("2022-01-01", "%Y-%m-%d")
@@ -126,16 +143,20 @@ def read_and_decode(reader, chunk_size, max_window_size, previous_chunk=None, by
 		return read_and_decode(reader, chunk_size, max_window_size, chunk, bytes_read)
 
 
-def read_lines_zst(file_name):
+def read_lines_zst(file_name, profiler=None):
 	with open(file_name, 'rb') as file_handle:
 		buffer = ''
 		reader = zstandard.ZstdDecompressor(max_window_size=2**31).stream_reader(file_handle)
 		while True:
+			started, started_cpu = time.perf_counter(), time.process_time()
 			chunk = read_and_decode(reader, 2**27, (2**29) * 2)
 
 			if not chunk:
 				break
 			lines = (buffer + chunk).split("\n")
+			if profiler is not None:
+				# chunks are large, so timing them (wall and CPU) costs nothing noticeable
+				profiler.add("decompress", time.perf_counter() - started, time.process_time() - started_cpu)
 
 			for line in lines[:-1]:
 				yield line.strip(), file_handle.tell()
@@ -145,7 +166,21 @@ def read_lines_zst(file_name):
 		reader.close()
 
 
-def process_file(input_file, output_file, output_format, from_date, to_date, single_field):
+def matches_keywords(obj):
+	# Combine title, selftext, and body into a single string for searching
+	title = obj.get('title', '')
+	selftext = obj.get('selftext', '')
+	body = obj.get('body', '')
+	search_text = (title + ' ' + selftext + ' ' + body).lower()
+
+	# Check if any keyword exists in the combined text
+	for keyword in KEYWORDS:
+		if keyword in search_text:
+			return True
+	return False
+
+
+def process_file(input_file, output_file, output_format, from_date, to_date, single_field, deduplicator=None, profiler=None):
 	output_path = f"{output_file}.{output_format}"
 	is_submission = "submission" in input_file
 	log.info(f"Input: {input_file} : Output: {output_path} : Is submission {is_submission}")
@@ -164,38 +199,43 @@ def process_file(input_file, output_file, output_format, from_date, to_date, sin
 	file_size = os.stat(input_file).st_size
 	created = None
 	matched_lines = 0
+	duplicate_lines = 0
 	bad_lines = 0
 	total_lines = 0
-	for line, file_bytes_processed in read_lines_zst(input_file):
+	# per-line stages are timed with perf_counter only; reading the CPU clock per line would cost more than parsing.
+	# without a profiler nothing is timed per line
+	perf_counter = time.perf_counter
+	timing = profiler is not None
+	parse_seconds = filter_seconds = write_seconds = 0.0
+	file_started, file_started_cpu = perf_counter(), time.process_time()
+	file_bytes_processed = 0
+	for line, file_bytes_processed in read_lines_zst(input_file, profiler):
 		total_lines += 1
 		if total_lines % 100000 == 0:
-			log.info(f"{created.strftime('%Y-%m-%d %H:%M:%S')} : {total_lines:,} : {matched_lines:,} : {bad_lines:,} : {file_bytes_processed:,}:{(file_bytes_processed / file_size) * 100:.0f}%")
+			created_str = created.strftime('%Y-%m-%d %H:%M:%S') if created is not None else "-"
+			elapsed = perf_counter() - file_started
+			log.info(f"{created_str} : {total_lines:,} : {matched_lines:,} : {bad_lines:,} : {file_bytes_processed:,}:{(file_bytes_processed / file_size) * 100:.0f}% : {total_lines / elapsed:,.0f} lines/s : {file_bytes_processed / elapsed / 2**20:,.1f} MB/s")
 
 		try:
+			if timing:
+				started = perf_counter()
 			obj = json.loads(line)
-			created = datetime.utcfromtimestamp(int(obj['created_utc']))
-
-            # *** ORIGINAL DATE FILTER LOGIC ***
-            # This will correctly filter lines based on the date range at the top
-			if created < from_date:
-				continue
-			if created > to_date:
-				continue
-
-            # *** KEYWORD FILTER LOGIC ***
-			# Combine title, selftext, and body into a single string for searching
-			title = obj.get('title', '')
-			selftext = obj.get('selftext', '')
-			body = obj.get('body', '')
-			search_text = (title + ' ' + selftext + ' ' + body).lower()
-
-			# Check if any keyword exists in the combined text
-			matched = False
-			for keyword in KEYWORDS:
-				if keyword in search_text:
-					matched = True
-					break
-			
+			if timing:
+				parsed = perf_counter()
+				parse_seconds += parsed - started
+
+			matched = sample_rate is None or keep_by_rate(obj, sample_rate)
+			if matched:
+				created = datetime.utcfromtimestamp(int(obj['created_utc']))
+				# *** DATE AND KEYWORD FILTER LOGIC ***
+				# Keep lines inside the date range at the top that contain any of the KEYWORDS
+				matched = from_date <= created <= to_date and matches_keywords(obj)
+			if matched and deduplicator is not None and deduplicator.is_duplicate(obj):
+				duplicate_lines += 1
+				matched = False
+			if timing:
+				filtered = perf_counter()
+				filter_seconds += filtered - parsed
 			if not matched:
 				continue
 
@@ -211,6 +251,8 @@ def process_file(input_file, output_file, output_format, from_date, to_date, sin
 					write_line_json(handle, obj)
 			else:
 				log.info(f"Something went wrong, invalid output format {output_format}")
+			if timing:
+				write_seconds += perf_counter() - filtered
 		except (KeyError, json.JSONDecodeError) as err:
 			bad_lines += 1
 			if write_bad_lines:
@@ -221,8 +263,26 @@ def process_file(input_file, output_file, output_format, from_date, to_date, sin
 					log.warning(f"Line decoding failed: {err}")
 				# log.warning(line) # Commented out to reduce log spam
 
+	close_started = perf_counter()
 	handle.close()
-	log.info(f"Complete : {total_lines:,} : {matched_lines:,} : {bad_lines:,}")
+	write_seconds += perf_counter() - close_started
+	log.info(f"Complete : {total_lines:,} : {matched_lines:,} : {bad_lines:,} : {duplicate_lines:,} duplicates")
+
+	if profiler is not None:
+		profiler.add("parse", parse_seconds)
+		profiler.add("filter", filter_seconds)
+		profiler.add("write", write_seconds)
+		profiler.add("total", perf_counter() - file_started, time.process_time() - file_started_cpu)
+		# counted in MB so the derived rates read as MB/s of compressed input
+		profiler.count("decompress", "compressed_mb", file_size / 2**20)
+		profiler.count("parse", "lines", total_lines)
+		profiler.count("filter", "lines", total_lines)
+		profiler.count("write", "matched", matched_lines)
+		profiler.count("total", "compressed_mb", file_size / 2**20)
+		profiler.count("total", "lines", total_lines)
+		profiler.count("total", "matched", matched_lines)
+		profiler.count("total", "bad_lines", bad_lines, rate=False)
+		profiler.count("total", "duplicates", duplicate_lines, rate=False)
 
 
 if __name__ == "__main__":
@@ -234,6 +294,8 @@ if __name__ == "__main__":
 	log.info(f"Filtering on {len(KEYWORDS)} keywords")
 	log.info(f"From date {from_date.strftime('%Y-%m-%d')} to date {to_date.strftime('%Y-%m-%d')}")
 	log.info(f"Output format set to {output_format}")
+	if sample_rate is not None:
+		log.info(f"Sampling {sample_rate:.2%} of input lines")
 
 	input_files = []
 	if os.path.isdir(input_file):
@@ -247,10 +309,22 @@ if __name__ == "__main__":
 		input_files.append((input_file, output_file))
 		
 	log.info(f"Processing {len(input_files)} files")
+	profiler = StageProfiler("reddit_data")
+	profiler.info['files'] = [file_in for file_in, _ in input_files]
+	deduplicator = None
+	if deduplicate:
+		from dedup import Deduplicator
+		# one deduplicator across all files, so reposts across subreddits are caught too
+		deduplicator = Deduplicator()
+		log.info(f"Dropping duplicates ({deduplicator.bands} bands x {deduplicator.rows} rows)")
 	for file_in, file_out in input_files:
 		try:
             # Updated function call to remove the old unused arguments
-			process_file(file_in, file_out, output_format, from_date, to_date, single_field)
+			process_file(file_in, file_out, output_format, from_date, to_date, single_field, deduplicator, profiler)
 		except Exception as err:
 			log.warning(f"Error processing {file_in}: {err}")
-			log.warning(traceback.format_exc())
\ No newline at end of file
+			log.warning(traceback.format_exc())
+
+	if deduplicator is not None:
+		log.info(deduplicator.summary())
+	profiler.finish(profile_report, prometheus_textfile, log.info)
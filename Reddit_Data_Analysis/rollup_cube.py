@@ -0,0 +1,259 @@
+import json
+import os
+from collections import Counter
+from datetime import datetime, timezone
+
+from run_queries import THEMES, categorize_text, tokenizer
+from nlp_resources import get_analyzer
+
+# --- 1. CONFIGURATION ---
+# CHANGE THIS to the FOLDER containing filtered .txt files from reddit_data.py
+INPUT_FOLDER = r"/Users/maitreya/Documents/NEU/CS 5170 - AI for HCI/Code/SkillBridge/reddit_analysis"
+
+# The cube is a small JSON file; time-series reports read only this file
+CUBE_FILE = os.path.join(INPUT_FOLDER, "rollup_cube.json")
+
+# Set to True to throw the existing cube away and rebuild it from every input file
+REBUILD = False
+
+# Sentiment histogram: equal-width bins over the VADER compound range [-1, 1]
+SENTIMENT_BINS = 20
+
+# Number of terms kept per cell when the cube is saved. Merged top terms are
+# exact as long as a term stays inside this window in every merged batch.
+TOP_TERMS_KEPT = 200
+
+# Number of records tokenized together
+BATCH_SIZE = 10000
+
+CUBE_VERSION = 1
+
+
+# --- 2. LOADING ---
+def load_records(filepath):
+    """Yields one record per post/comment, keeping the fields needed for trends."""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                post = json.loads(line)
+                if post.get('_duplicate'):
+                    continue  # Marked by dedup.py
+                text_content = post.get('body', post.get('selftext', ''))
+                title = post.get('title', '')
+                text = (title + ' ' + text_content).lower().strip()
+                if not text:
+                    continue
+                created = datetime.fromtimestamp(int(post['created_utc']), tz=timezone.utc)
+                yield {
+                    'text': text,
+                    'month': created.strftime('%Y-%m'),
+                    'subreddit': (post.get('subreddit') or 'unknown').lower(),
+                    'score': int(post.get('score', 0) or 0),
+                }
+            except (KeyError, ValueError, TypeError):
+                # ValueError covers json.JSONDecodeError and bad timestamps
+                continue
+
+
+def file_signature(filepath):
+    """Size and modification time, used to tell whether a file was already ingested."""
+    stat = os.stat(filepath)
+    return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
+
+
+# --- 3. CUBE ---
+def new_cube():
+    return {'version': CUBE_VERSION, 'sentiment_bins': SENTIMENT_BINS, 'ingested': {}, 'cells': {}}
+
+
+def cell_key(month, subreddit, theme):
+    return f"{month}|{subreddit}|{theme}"
+
+
+def split_key(key):
+    month, subreddit, theme = key.split('|')
+    return month, subreddit, theme
+
+
+def new_cell():
+    return {
+        'count': 0,
+        'score_sum': 0,
+        'sentiment_sum': 0.0,
+        'sentiment_sumsq': 0.0,
+        'sentiment_hist': [0] * SENTIMENT_BINS,
+        'terms': Counter(),
+    }
+
+
+def sentiment_bin(compound):
+    """Maps a compound score in [-1, 1] to a histogram bin index."""
+    index = int((compound + 1.0) / 2.0 * SENTIMENT_BINS)
+    return min(max(index, 0), SENTIMENT_BINS - 1)
+
+
+def add_record(cells, record, token_ids):
+    """Adds one enriched post to every (month, subreddit, theme) cell it belongs to.
+
+    While a file is being built, cell terms are counted by token id.
+    """
+    compound = get_analyzer().polarity_scores(record['text'])['compound']
+    bin_index = sentiment_bin(compound)
+    for theme in categorize_text(record['text']):
+        key = cell_key(record['month'], record['subreddit'], theme)
+        cell = cells.get(key)
+        if cell is None:
+            cell = cells[key] = new_cell()
+        cell['count'] += 1
+        cell['score_sum'] += record['score']
+        cell['sentiment_sum'] += compound
+        cell['sentiment_sumsq'] += compound * compound
+        cell['sentiment_hist'][bin_index] += 1
+        cell['terms'].update(token_ids.tolist())
+
+
+def add_batch(cells, batch):
+    token_ids = tokenizer.tokenize_batch([record['text'] for record in batch])
+    for record, ids in zip(batch, token_ids):
+        add_record(cells, record, ids)
+
+
+def build_cells(filepath):
+    """Rolls a single filtered file up into fresh cells."""
+    cells = {}
+    batch = []
+    for record in load_records(filepath):
+        batch.append(record)
+        if len(batch) == BATCH_SIZE:
+            add_batch(cells, batch)
+            batch = []
+    add_batch(cells, batch)
+    # Term ids only mean something to this process; store words in the cube
+    words = tokenizer.vocab.words
+    for cell in cells.values():
+        cell['terms'] = Counter({words[token_id]: count for token_id, count in cell['terms'].items()})
+    return cells
+
+
+def merge_cell(target, cell):
+    """Adds one cell into another. Counts, sums and histograms are all additive."""
+    target['count'] += cell['count']
+    target['score_sum'] += cell['score_sum']
+    target['sentiment_sum'] += cell['sentiment_sum']
+    target['sentiment_sumsq'] += cell['sentiment_sumsq']
+    target['sentiment_hist'] = [a + b for a, b in zip(target['sentiment_hist'], cell['sentiment_hist'])]
+    target['terms'].update(cell['terms'])
+
+
+def merge_cells(cube, cells):
+    """Merges freshly built cells into the cube."""
+    for key, cell in cells.items():
+        target = cube['cells'].get(key)
+        if target is None:
+            cube['cells'][key] = cell
+        else:
+            merge_cell(target, cell)
+
+
+def load_cube(path):
+    """Loads the cube from disk, or returns an empty cube if it does not exist yet."""
+    if not os.path.exists(path):
+        return new_cube()
+    with open(path, 'r', encoding='utf-8') as f:
+        cube = json.load(f)
+    if cube.get('version') != CUBE_VERSION or cube.get('sentiment_bins') != SENTIMENT_BINS:
+        print(f"Cube at {path} was built with different settings, starting a new one.")
+        return new_cube()
+    for cell in cube['cells'].values():
+        cell['terms'] = Counter(dict(cell['terms']))
+    return cube
+
+
+def save_cube(cube, path):
+    """Writes the cube to disk, keeping only the top terms of each cell."""
+    cells = {}
+    for key, cell in cube['cells'].items():
+        saved = dict(cell)
+        saved['terms'] = cell['terms'].most_common(TOP_TERMS_KEPT)
+        cells[key] = saved
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({**cube, 'cells': cells}, f)
+    os.replace(tmp_path, path)
+
+
+def update_cube(folder_path, cube_path, rebuild=False):
+    """Rolls up every filtered file that is not in the cube yet and saves the result."""
+    cube = new_cube() if rebuild else load_cube(cube_path)
+    files = sorted(f for f in os.listdir(folder_path) if f.endswith(('.txt', '.jsonl')))
+    added = 0
+    for filename in files:
+        signature = file_signature(os.path.join(folder_path, filename))
+        previous = cube['ingested'].get(filename)
+        if previous == signature:
+            continue
+        if previous is not None:
+            # Merging again would double count the rows we already have
+            print(f"  -> {filename} changed since it was ingested, skipping. Set REBUILD = True to rebuild.")
+            continue
+        print(f"  -> Rolling up {filename}...")
+        merge_cells(cube, build_cells(os.path.join(folder_path, filename)))
+        cube['ingested'][filename] = signature
+        added += 1
+    if added or rebuild:
+        save_cube(cube, cube_path)
+    print(f"Cube has {len(cube['cells'])} cells from {len(cube['ingested'])} files ({added} new).")
+    return cube
+
+
+# --- 4. QUERIES ---
+def trend(cube, theme, subreddit=None):
+    """Returns per-month totals for a theme, optionally restricted to one subreddit."""
+    months = {}
+    for key, cell in cube['cells'].items():
+        month, cell_subreddit, cell_theme = split_key(key)
+        if cell_theme != theme or (subreddit is not None and cell_subreddit != subreddit):
+            continue
+        if month not in months:
+            months[month] = new_cell()
+        merge_cell(months[month], cell)
+    rows = []
+    for month in sorted(months):
+        total = months[month]
+        count = total['count']
+        mean = total['sentiment_sum'] / count
+        variance = max(total['sentiment_sumsq'] / count - mean * mean, 0.0)
+        rows.append({
+            'month': month,
+            'count': count,
+            'mean_score': total['score_sum'] / count,
+            'mean_sentiment': mean,
+            'std_sentiment': variance ** 0.5,
+            'sentiment_hist': total['sentiment_hist'],
+            'top_terms': total['terms'].most_common(10),
+        })
+    return rows
+
+
+def main():
+    print(f"Updating rollup cube {CUBE_FILE} from {INPUT_FOLDER}...")
+    if not os.path.isdir(INPUT_FOLDER):
+        print(f"Error: Path is not a valid folder: {INPUT_FOLDER}")
+        return
+    cube = update_cube(INPUT_FOLDER, CUBE_FILE, rebuild=REBUILD)
+
+    for theme in list(THEMES.keys()) + ['Other']:
+        print("\n" + "="*50)
+        print(f"--- Monthly trend: {theme} ---")
+        rows = trend(cube, theme)
+        if not rows:
+            print("  No data found for this theme.")
+            continue
+        for row in rows:
+            terms = ', '.join(word for word, count in row['top_terms'][:5])
+            print(f"  {row['month']}: {row['count']:>7,} posts | sentiment {row['mean_sentiment']:+.3f} "
+                  f"(sd {row['std_sentiment']:.3f}) | top: {terms}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,34 @@
 import json
 import re
-import pandas as pd
-import nltk
-from nltk.corpus import stopwords
-from collections import Counter
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from tokenizer import Tokenizer, top_unigrams, top_bigrams
+from sampling import sample_posts
+from nlp_resources import load_stop_words, get_analyzer
+from profiling import StageProfiler
 import os
 
 # --- 1. SETUP ---
-# Ensure stopword list is downloaded
-try:
-    stop_words = set(stopwords.words('english'))
-except LookupError:
-    nltk.download('stopwords')
-    stop_words = set(stopwords.words('english'))
-
-# Initialize the VADER sentiment analyzer
-analyzer = SentimentIntensityAnalyzer()
+# pandas and the VADER analyzer are loaded only in the code paths that need them
+stop_words = load_stop_words()
 
 # --- 2. CONFIGURATION ---
 # CHANGE THIS to the FOLDER containing filtered .txt files
 INPUT_FOLDER = r"/Users/maitreya/Documents/NEU/CS 5170 - AI for HCI/Code/SkillBridge/reddit_analysis"
 
+# Dev sampling: set SAMPLE_SIZE (posts) or SAMPLE_RATE (fraction) to load a reproducible
+# sample instead of the whole corpus. Posts are picked by a hash of their id, so the same
+# sample comes back on every run. SAMPLE_STRATIFY can be None, 'subreddit' or 'theme'; a
+# stratified SAMPLE_SIZE is still the total, split across strata in proportion to their size.
+SAMPLE_SIZE = None
+SAMPLE_RATE = None
+SAMPLE_STRATIFY = None
+
+# Per-stage profile (wall/CPU time, throughput, peak memory) is printed at the end of every run.
+# Set these to paths to also write it as JSON and/or as a Prometheus textfile.
+PROFILE_REPORT = None
+PROMETHEUS_TEXTFILE = None
+
+profiler = StageProfiler('run_queries')
+
 # Define your keyword themes based on your Affinity Map clusters
 THEMES = {
     'AI_Anxiety': [
@@ -46,17 +53,13 @@ THEMES = {
     ]
 }
 
+# Stop words are dropped for N-grams, BUT important theme keywords are kept
+THEME_KEYWORDS = set(kw for kws in THEMES.values() for kw in kws)
+tokenizer = Tokenizer(stop_words, THEME_KEYWORDS)
+
 # --- 3. HELPER FUNCTIONS ---
-def load_data_from_folder(folder_path):
-    """Loads all .txt or .jsonl files from a folder into a list of dictionaries."""
-    data = []
-    files_to_process = [f for f in os.listdir(folder_path) if f.endswith(('.txt', '.jsonl'))]
-    if not files_to_process:
-        print(f"No .txt or .jsonl files found in {folder_path}")
-        return data, None
-        
-    print(f"Found {len(files_to_process)} files to process.")
-    
+def read_posts(folder_path, files_to_process):
+    """Yields every parsed post/comment from the given files."""
     for filename in files_to_process:
         filepath = os.path.join(folder_path, filename)
         print(f"Loading data from {filename}...")
@@ -64,14 +67,32 @@ def load_data_from_folder(folder_path):
             for line_number, line in enumerate(f):
                 try:
                     post = json.loads(line)
-                    text_content = post.get('body', post.get('selftext', ''))
-                    title = post.get('title', '')
-                    text = (title + ' ' + text_content).lower().strip()
-                    if text:
-                        data.append({'text': text})
                 except json.JSONDecodeError:
                     # print(f"Skipping bad line in {filename} at line {line_number}")
                     continue
+                if post.get('_duplicate'):
+                    continue  # Marked by dedup.py
+                yield post
+
+def load_data_from_folder(folder_path):
+    """Loads all .txt or .jsonl files from a folder into a list of dictionaries."""
+    import pandas as pd
+    data = []
+    files_to_process = [f for f in os.listdir(folder_path) if f.endswith(('.txt', '.jsonl'))]
+    if not files_to_process:
+        print(f"No .txt or .jsonl files found in {folder_path}")
+        return data, None
+        
+    print(f"Found {len(files_to_process)} files to process.")
+
+    posts = sample_posts(read_posts(folder_path, files_to_process), size=SAMPLE_SIZE, rate=SAMPLE_RATE,
+                         stratify=SAMPLE_STRATIFY, categorize=categorize_text)
+    for post in posts:
+        text_content = post.get('body', post.get('selftext', ''))
+        title = post.get('title', '')
+        text = (title + ' ' + text_content).lower().strip()
+        if text:
+            data.append({'text': text})
     return pd.DataFrame(data)
 
 def categorize_text(text):
@@ -82,42 +103,25 @@ def categorize_text(text):
             found_themes.append(theme)
     return found_themes if found_themes else ['Other']
 
-def clean_text_for_ngrams(text, theme_keywords):
-    """Cleans text for N-gram frequency analysis."""
-    text = re.sub(r'[^\w\s]', '', text)  # Remove punctuation
-    words = text.split()
-    # Remove stopwords, BUT keep important theme keywords
-    cleaned_words = [
-        w for w in words 
-        if w not in stop_words or w in theme_keywords
-    ]
-    return cleaned_words
-
-def run_ngram_analysis(text_series, top_n_unigrams=20, top_n_bigrams=15):
-    """Runs and prints N-gram analysis for a given pandas Series of text."""
-    if text_series.empty:
+def run_ngram_analysis(token_series, top_n_unigrams=20, top_n_bigrams=15):
+    """Runs and prints N-gram analysis for a given pandas Series of token-id arrays."""
+    if token_series.empty:
         print("  No data found for this query.")
         return
 
-    # Get the theme keywords to preserve them
-    theme_keywords = set(kw for kws in THEMES.values() for kw in kws)
-    
-    # Clean all text and combine into one giant list of words
-    all_words = []
-    for words_list in text_series.apply(lambda x: clean_text_for_ngrams(x, theme_keywords)):
-        all_words.extend(words_list)
+    with profiler.stage('ngram'):
+        unigram_counts = top_unigrams(token_series, tokenizer.vocab, top_n_unigrams)
+        bigram_counts = top_bigrams(token_series, tokenizer.vocab, top_n_bigrams)
+    profiler.count('ngram', 'posts', len(token_series))
 
     # Unigrams (Single Keywords)
-    unigram_counts = Counter(all_words)
     print(f"\n  Top {top_n_unigrams} Most Common Keywords (Unigrams):")
-    for word, count in unigram_counts.most_common(top_n_unigrams):
+    for word, count in unigram_counts:
         print(f"    {word}: {count}")
 
     # Bigrams (Two-word Phrases)
-    bigrams = list(nltk.bigrams(all_words))
-    bigram_counts = Counter(bigrams)
     print(f"\n  Top {top_n_bigrams} Most Common Phrases (Bigrams):")
-    for (w1, w2), count in bigram_counts.most_common(top_n_bigrams):
+    for (w1, w2), count in bigram_counts:
         print(f"    {w1} {w2}: {count}")
 
 def run_sentiment_analysis(sentiment_series):
@@ -137,24 +141,37 @@ def run_sentiment_analysis(sentiment_series):
 def main():
     # --- Step 1: Load All Data ---
     print(f"Loading all files from folder: {INPUT_FOLDER}...")
-    df = load_data_from_folder(INPUT_FOLDER)
+    with profiler.stage('load'):
+        df = load_data_from_folder(INPUT_FOLDER)
     if df.empty:
         print("No data loaded. Exiting.")
         return
+    profiler.count('load', 'posts', len(df))
     print(f"Successfully loaded {len(df)} total posts/comments.")
 
     # --- Step 2: Pre-process Data (Themes & Sentiment) ---
     print("Pre-processing data (this may take a minute)...")
     
     # Apply themes
-    df['themes'] = df['text'].apply(categorize_text)
-    
+    with profiler.stage('tag'):
+        df['themes'] = df['text'].apply(categorize_text)
+    profiler.count('tag', 'posts', len(df))
+
     # Apply sentiment
-    df['sentiment'] = df['text'].apply(lambda text: analyzer.polarity_scores(text)['compound'])
-    
+    with profiler.stage('sentiment'):
+        analyzer = get_analyzer()
+        df['sentiment'] = df['text'].apply(lambda text: analyzer.polarity_scores(text)['compound'])
+    profiler.count('sentiment', 'posts', len(df))
+
+    # Tokenize once, in batches; every query below counts these token-id arrays
+    with profiler.stage('tokenize'):
+        df['tokens'] = tokenizer.tokenize_all(df['text'])
+    profiler.count('tokenize', 'posts', len(df))
+
     # Explode themes for easy filtering
     # This creates a row for each theme a post belongs to
-    df_exploded = df.explode('themes')
+    with profiler.stage('tag'):
+        df_exploded = df.explode('themes')
     print("Pre-processing complete.")
 
     # --- Step 3: Run Queries ---
@@ -168,7 +185,7 @@ def main():
         (df_exploded['text'].str.contains('project')) # 'projects' is already a theme keyword
     ]
     print(f"  Found {len(q1_df)} matching posts.")
-    run_ngram_analysis(q1_df['text'], top_n_unigrams=15, top_n_bigrams=20)
+    run_ngram_analysis(q1_df['tokens'], top_n_unigrams=15, top_n_bigrams=20)
 
     # --- Query 2: Free Resources ---
     print("\n" + "="*50)
@@ -179,7 +196,7 @@ def main():
         (df_exploded['text'].str.contains('free|youtube|affordable'))
     ]
     print(f"  Found {len(q2_df)} matching posts.")
-    run_ngram_analysis(q2_df['text'], top_n_unigrams=30, top_n_bigrams=20)
+    run_ngram_analysis(q2_df['tokens'], top_n_unigrams=30, top_n_bigrams=20)
 
     # --- Query 3: The "Trust Gap" (Paid Platforms) ---
     print("\n" + "="*50)
@@ -191,7 +208,7 @@ def main():
     ]
     print(f"  Found {len(q3_df)} matching posts.")
     run_sentiment_analysis(q3_df['sentiment'])
-    run_ngram_analysis(q3_df['text'], top_n_unigrams=15, top_n_bigrams=20)
+    run_ngram_analysis(q3_df['tokens'], top_n_unigrams=15, top_n_bigrams=20)
 
     # --- Query 4: The "Hurt" (Negative AI Anxiety) ---
     print("\n" + "="*50)
@@ -202,7 +219,7 @@ def main():
         (df_exploded['sentiment'] < -0.05)
     ]
     print(f"  Found {len(q4_df)} matching posts (out of {len(df_exploded[df_exploded['themes'] == 'AI_Anxiety'])} total AI posts).")
-    run_ngram_analysis(q4_df['text'], top_n_unigrams=20, top_n_bigrams=20)
+    run_ngram_analysis(q4_df['tokens'], top_n_unigrams=20, top_n_bigrams=20)
 
     # --- Query 5: The "Help" (Positive AI Anxiety) ---
     print("\n" + "="*50)
@@ -213,7 +230,7 @@ def main():
         (df_exploded['sentiment'] > 0.05)
     ]
     print(f"  Found {len(q5_df)} matching posts.")
-    run_ngram_analysis(q5_df['text'], top_n_unigrams=20, top_n_bigrams=20)
+    run_ngram_analysis(q5_df['tokens'], top_n_unigrams=20, top_n_bigrams=20)
 
     # --- Query 6: The "Pathway" (Career Change) ---
     print("\n" + "="*50)
@@ -225,7 +242,7 @@ def main():
         (df['text'].str.contains('qa|data analyst|software engineer'))
     ]
     print(f"  Found {len(q6_df)} matching posts.")
-    run_ngram_analysis(q6_df['text'], top_n_unigrams=30, top_n_bigrams=20)
+    run_ngram_analysis(q6_df['tokens'], top_n_unigrams=30, top_n_bigrams=20)
     
     # Also print a few sample posts for qualitative review
     print("\n  --- Sample Posts (Query 6) ---")
@@ -239,6 +256,9 @@ def main():
     else:
         print("    No sample posts to display.")
 
+    print()
+    profiler.finish(PROFILE_REPORT, PROMETHEUS_TEXTFILE)
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,101 @@
+import heapq
+from hashlib import blake2b
+
+# Changing the seed draws a different (but still reproducible) sample
+SAMPLE_SEED = 0
+
+_HASH_SCALE = float(2 ** 64)
+
+
+def post_hash(post, seed=SAMPLE_SEED):
+    """Maps a post to a stable number in [0, 1) based on its id."""
+    key = post.get('id')
+    if key is None:
+        # No id to go on; fall back to the content so the choice is still stable
+        key = f"{post.get('created_utc', '')}:{post.get('title', '')}:{post.get('body', post.get('selftext', ''))}"
+    digest = blake2b(f"{seed}:{key}".encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') / _HASH_SCALE
+
+
+def keep_by_rate(post, rate, seed=SAMPLE_SEED):
+    """True for roughly `rate` of all posts, always the same ones for the same seed."""
+    return post_hash(post, seed) < rate
+
+
+def sample_by_rate(posts, rate, seed=SAMPLE_SEED):
+    """Streams through posts keeping a stable fraction of them. Uses no extra memory."""
+    for post in posts:
+        if keep_by_rate(post, rate, seed):
+            yield post
+
+
+def allocate(size, counts):
+    """Splits size across strata in proportion to their counts (largest remainder method)."""
+    total = sum(counts.values())
+    if total <= size:
+        return dict(counts)
+    shares = {key: size * count / total for key, count in counts.items()}
+    allocation = {key: int(share) for key, share in shares.items()}
+    # Hand out what is left to the largest remainders; ties go to the larger stratum, then by name
+    leftover = size - sum(allocation.values())
+    order = sorted(shares, key=lambda key: (-(shares[key] - allocation[key]), -counts[key], str(key)))
+    for key in order[:leftover]:
+        allocation[key] += 1
+    return allocation
+
+
+def sample_by_size(posts, size, stratum=None, seed=SAMPLE_SEED):
+    """Keeps the `size` posts with the smallest id hash. If stratum is given, size is split
+    across strata in proportion to how many posts each has, and each stratum keeps its
+    share of posts with the smallest id hash.
+
+    This is a reservoir that does not depend on input order: the same posts are picked
+    on every run, and (unstratified) a post in a smaller sample is also in every larger
+    one. Memory is bounded by the sample size per stratum. Posts are yielded in their
+    original order.
+    """
+    reservoirs = {}
+    counts = {}
+    for seq, post in enumerate(posts):
+        key = stratum(post) if stratum is not None else None
+        counts[key] = counts.get(key, 0) + 1
+        reservoir = reservoirs.setdefault(key, [])
+        # Max-heap on hash via negation, so the largest kept hash is evicted first
+        entry = (-post_hash(post, seed), seq, post)
+        if len(reservoir) < size:
+            heapq.heappush(reservoir, entry)
+        elif entry > reservoir[0]:
+            heapq.heapreplace(reservoir, entry)
+    # Each reservoir holds at least its share, since no share exceeds size
+    allocation = allocate(size, counts)
+    kept = [entry for key, reservoir in reservoirs.items()
+            for entry in heapq.nlargest(allocation[key], reservoir)]
+    kept.sort(key=lambda entry: entry[1])
+    for _, _, post in kept:
+        yield post
+
+
+def sample_posts(posts, size=None, rate=None, stratify=None, categorize=None, seed=SAMPLE_SEED):
+    """Applies the sampling settings of an analysis script to a stream of parsed posts.
+
+    stratify is None, 'subreddit' or 'theme'; 'theme' needs categorize (text -> themes) and
+    uses the first theme a post is tagged with. With neither size nor rate, posts pass through.
+    """
+    if rate is not None:
+        posts = sample_by_rate(posts, rate, seed)
+    if size is None:
+        return posts
+    if size < 1:
+        raise ValueError(f"Sample size must be at least 1, got {size!r}")
+
+    if stratify is None:
+        stratum = None
+    elif stratify == 'subreddit':
+        stratum = lambda post: (post.get('subreddit') or 'unknown').lower()
+    elif stratify == 'theme':
+        stratum = lambda post: categorize(
+            (post.get('title', '') + ' ' + post.get('body', post.get('selftext', ''))).lower()
+        )[0]
+    else:
+        raise ValueError(f"Unknown stratify option {stratify!r}, expected None, 'subreddit' or 'theme'")
+    return sample_by_size(posts, size, stratum, seed)
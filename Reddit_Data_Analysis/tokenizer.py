@@ -0,0 +1,127 @@
+import re
+from collections import Counter
+from itertools import chain
+
+import numpy as np
+
+# Same normalization the analysis scripts have always used: drop punctuation, split on whitespace
+PUNCTUATION_RE = re.compile(r'[^\w\s]+')
+
+# Number of documents normalized together in one regex pass
+BATCH_SIZE = 10000
+
+TOKEN_DTYPE = np.int32
+
+
+class Vocabulary(dict):
+    """Interns words to dense integer ids. Looking up an unseen word assigns it the next id."""
+
+    def __init__(self):
+        super().__init__()
+        self.words = []
+
+    def __missing__(self, word):
+        token_id = self[word] = len(self.words)
+        self.words.append(word)
+        return token_id
+
+
+class Tokenizer:
+    """Compiled-once tokenizer that turns batches of documents into token-id arrays.
+
+    Stop words are dropped unless they are also in keep_words (the theme keywords).
+    """
+
+    def __init__(self, stop_words, keep_words=()):
+        self.vocab = Vocabulary()
+        self._drop = frozenset(stop_words) - frozenset(keep_words)
+        # _keep[token_id] is False for stop words; grown as the vocabulary grows
+        self._keep = np.ones(0, dtype=bool)
+
+    def _sync_keep(self):
+        known = len(self._keep)
+        if known == len(self.vocab.words):
+            return
+        new_words = self.vocab.words[known:]
+        new_keep = np.fromiter((w not in self._drop for w in new_words), dtype=bool, count=len(new_words))
+        self._keep = np.concatenate([self._keep, new_keep])
+
+    def tokenize_batch(self, texts):
+        """Tokenizes a list of documents in one pass and returns one id array per document."""
+        if not texts:
+            return []
+        # Documents are joined on newlines, so newlines inside a document become plain whitespace
+        joined = '\n'.join(text.replace('\n', ' ') for text in texts)
+        word_lists = [doc.split() for doc in PUNCTUATION_RE.sub('', joined).split('\n')]
+        flat = list(chain.from_iterable(word_lists))
+        ids = np.fromiter(map(self.vocab.__getitem__, flat), dtype=TOKEN_DTYPE, count=len(flat))
+        self._sync_keep()
+
+        mask = self._keep[ids]
+        kept = ids[mask]
+        # Map each document's word offsets to offsets into the kept ids
+        offsets = np.zeros(len(word_lists) + 1, dtype=np.int64)
+        np.cumsum([len(words) for words in word_lists], out=offsets[1:])
+        kept_before = np.zeros(len(flat) + 1, dtype=np.int64)
+        np.cumsum(mask, out=kept_before[1:])
+        return np.split(kept, kept_before[offsets[1:-1]])
+
+    def tokenize_all(self, texts, batch_size=BATCH_SIZE):
+        """Tokenizes any iterable of documents in batches and returns one id array per document."""
+        texts = list(texts)
+        token_ids = []
+        for start in range(0, len(texts), batch_size):
+            token_ids.extend(self.tokenize_batch(texts[start:start + batch_size]))
+        return token_ids
+
+    def words(self, token_ids):
+        """Turns an id array back into words."""
+        return [self.vocab.words[token_id] for token_id in token_ids]
+
+
+# --- Counting on token ids ---
+def _concat(token_ids):
+    token_ids = list(token_ids)
+    if not token_ids:
+        return np.zeros(0, dtype=TOKEN_DTYPE)
+    return np.concatenate(token_ids)
+
+
+def _top(keys, counts, n):
+    # Highest count first; ties keep the lowest key (first seen) first, like Counter.most_common
+    order = np.lexsort((keys, -counts))[:n]
+    return keys[order], counts[order]
+
+
+def count_unigrams(token_ids, vocab):
+    """Returns an array of counts indexed by token id."""
+    return np.bincount(_concat(token_ids), minlength=len(vocab.words))
+
+
+def unigram_counter(token_ids, vocab):
+    """Returns a word -> count Counter of every word that occurs."""
+    counts = count_unigrams(token_ids, vocab)
+    present = np.flatnonzero(counts)
+    return Counter({vocab.words[i]: int(counts[i]) for i in present})
+
+
+def top_unigrams(token_ids, vocab, n):
+    """Returns the n most common words as (word, count) pairs."""
+    counts = count_unigrams(token_ids, vocab)
+    present = np.flatnonzero(counts)
+    keys, top_counts = _top(present, counts[present], n)
+    return [(vocab.words[k], int(c)) for k, c in zip(keys, top_counts)]
+
+
+def top_bigrams(token_ids, vocab, n):
+    """Returns the n most common bigrams as ((w1, w2), count) pairs.
+
+    Bigrams are taken over all documents concatenated, matching nltk.bigrams(all_words).
+    """
+    stream = _concat(token_ids).astype(np.int64)
+    if len(stream) < 2:
+        return []
+    size = max(len(vocab.words), 1)
+    codes, counts = np.unique(stream[:-1] * size + stream[1:], return_counts=True)
+    keys, top_counts = _top(codes, counts, n)
+    return [((vocab.words[k // size], vocab.words[k % size]), int(c)) for k, c in zip(keys, top_counts)]